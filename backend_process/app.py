@@ -1,8 +1,10 @@
-from flask import Flask, render_template
-from dotenv import load_dotenv
 import os
 import sys
-from flask import Blueprint
+import time
+from contextlib import contextmanager
+
+from flask import Flask, Blueprint, render_template
+from dotenv import load_dotenv
 from flask_cors import CORS
 
 
@@ -12,58 +14,33 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from backend_process.extensions import mail
-from backend_process.routes.FetchStock import fetch_stock
-from backend_process.routes.StockRoutes import stock_routes
-from .train_model import train_lstm_model
-from .predict_stock import predict_stock_price
-from backend_process.routes.predict_route import predict_bp
 
 
 load_dotenv()
 
-app = Flask(
-    __name__,
-    template_folder=os.path.join(os.path.dirname(__file__), '..', 'public-pages'),
-    static_folder=os.path.join(os.path.dirname(__file__), '..', 'static')
-)
-CORS(app)
-
-app.secret_key = os.getenv("SECRET_KEY")
-
-# Flask-Mail config
-app.config['MAIL_SERVER'] = os.getenv("MAIL_SERVER")
-app.config['MAIL_PORT'] = int(os.getenv("MAIL_PORT"))
-app.config['MAIL_USE_TLS'] = os.getenv("MAIL_USE_TLS") == "True"
-app.config['MAIL_USERNAME'] = os.getenv("MAIL_USERNAME")
-app.config['MAIL_PASSWORD'] = os.getenv("MAIL_PASSWORD")
-app.config['MAIL_DEFAULT_SENDER'] = os.getenv("MAIL_DEFAULT_SENDER")
-
-mail.init_app(app)
-
-# Import blueprints AFTER extensions are initialized
-from backend_process.routes.auth_routes import auth
-from backend_process.routes.otp_routes import otp
-from backend_process.routes.gemini_routes import gemini_bp
-app.register_blueprint(auth, url_prefix='/auth')
-app.register_blueprint(otp, url_prefix='/otp')
-app.register_blueprint(fetch_stock, url_prefix='/api')
-app.register_blueprint(stock_routes, url_prefix="/api")
-app.register_blueprint(gemini_bp, url_prefix="/api")
-app.register_blueprint(predict_bp)
-
-
-# page routes to frontend 
-@app.route('/')
-def home():
-    return render_template('index.html')
-
-@app.route('/signup-page')
-def signup_page():
-    return render_template('signup.html')
-
-@app.route('/login-page')
-def login_page():
-    return render_template('login.html')
+
+class StartupTimer:
+    """Records how long each phase of app creation takes"""
+
+    def __init__(self):
+        self.phases = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - started) * 1000))
+
+    def report(self) -> dict:
+        total = (time.perf_counter() - self._started) * 1000
+        for name, ms in self.phases:
+            print(f"   {name:<28} {ms:8.1f} ms")
+        print(f"⏱️ App ready in {total:.1f} ms")
+        return {"phases": {name: round(ms, 1) for name, ms in self.phases}, "total_ms": round(total, 1)}
+
 
 # Dashboard placeholder
 dashboard = Blueprint('dashboard', __name__)
@@ -74,31 +51,123 @@ def view():
     if 'user' not in session:
         flash("Please log in first", "warning")
         return redirect(url_for('auth.login'))
-    
+
     # Validate user session and get user info
     from backend_process.utils.user_helpers import user_helper
     user_info = user_helper.validate_user_session(session)
-    
+
     if not user_info['valid']:
         flash("Session invalid. Please log in again.", "warning")
         return redirect(url_for('auth.login'))
-    
+
     # Pass both user_name and user_id to the template
-    return render_template('dashboard.html', 
-                         user_name=user_info['name'], 
+    return render_template('dashboard.html',
+                         user_name=user_info['name'],
                          user_id=user_info['user_id'])
-app.register_blueprint(dashboard, url_prefix='/dashboard')
-
-@app.route("/contact")
-def contact():
-    return render_template("contact.html")
 
 
-@app.route("/api/stocks/predict", methods=["POST"])
-def predict_stock(symbol):
-    return predict_stock(symbol)
+def _register_pages(app):
+    # page routes to frontend
+    @app.route('/')
+    def home():
+        return render_template('index.html')
+
+    @app.route('/signup-page')
+    def signup_page():
+        return render_template('signup.html')
+
+    @app.route('/login-page')
+    def login_page():
+        return render_template('login.html')
+
+    @app.route("/contact")
+    def contact():
+        return render_template("contact.html")
+
+
+def create_app(config=None):
+    """
+    Build the Flask app
+
+    Only web-facing modules are imported here; TensorFlow, the prediction engine
+    and yfinance are imported by the routes that use them on first request.
+
+    Args:
+        config: Optional mapping applied over the environment-based config
+
+    Returns:
+        Configured Flask application
+    """
+    timer = StartupTimer()
+
+    with timer.phase("config"):
+        app = Flask(
+            __name__,
+            template_folder=os.path.join(os.path.dirname(__file__), '..', 'public-pages'),
+            static_folder=os.path.join(os.path.dirname(__file__), '..', 'static')
+        )
+        CORS(app)
+
+        app.secret_key = os.getenv("SECRET_KEY")
+
+        # Flask-Mail config
+        app.config['MAIL_SERVER'] = os.getenv("MAIL_SERVER")
+        app.config['MAIL_PORT'] = int(os.getenv("MAIL_PORT", "587"))
+        app.config['MAIL_USE_TLS'] = os.getenv("MAIL_USE_TLS") == "True"
+        app.config['MAIL_USERNAME'] = os.getenv("MAIL_USERNAME")
+        app.config['MAIL_PASSWORD'] = os.getenv("MAIL_PASSWORD")
+        app.config['MAIL_DEFAULT_SENDER'] = os.getenv("MAIL_DEFAULT_SENDER")
+        if config:
+            app.config.update(config)
+
+    with timer.phase("extensions"):
+        mail.init_app(app)
+
+    # Import blueprints AFTER extensions are initialized
+    with timer.phase("import db_connection"):
+        from db_connection.db import init_db
+    with timer.phase("import auth/otp routes"):
+        from backend_process.routes.auth_routes import auth
+        from backend_process.routes.otp_routes import otp
+    with timer.phase("import stock routes"):
+        from backend_process.routes.FetchStock import fetch_stock
+        from backend_process.routes.StockRoutes import stock_routes
+    with timer.phase("import gemini routes"):
+        from backend_process.routes.gemini_routes import gemini_bp
+    with timer.phase("import predict routes"):
+        from backend_process.routes.predict_route import predict_bp
+    with timer.phase("import stream routes"):
+        from backend_process.routes.stream_routes import stream_bp
+
+    with timer.phase("register blueprints"):
+        app.register_blueprint(auth, url_prefix='/auth')
+        app.register_blueprint(otp, url_prefix='/otp')
+        app.register_blueprint(fetch_stock, url_prefix='/api')
+        app.register_blueprint(stock_routes, url_prefix="/api")
+        app.register_blueprint(gemini_bp, url_prefix="/api")
+        app.register_blueprint(predict_bp)
+        app.register_blueprint(stream_bp, url_prefix="/api")
+        app.register_blueprint(dashboard, url_prefix='/dashboard')
+        _register_pages(app)
+
+    # Collections and indexes are set up once per process
+    with timer.phase("init db"):
+        init_db()
+
+    app.config["STARTUP_TIMINGS"] = timer.report()
+    return app
+
+
+def __getattr__(name):
+    # Keeps `backend_process.app:app` working for WSGI servers without building an app on every import
+    if name == "app":
+        from backend_process.wsgi import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Run app
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Development server: create collections and indexes on startup unless told otherwise
+    os.environ.setdefault("DB_INIT_ON_STARTUP", "true")
+    create_app().run(debug=True)
@@ -0,0 +1,149 @@
+# ===============================
+# Predictr - Database Bootstrap
+# ===============================
+#
+# Creates and verifies every index the app relies on, then explains the hot
+# queries to catch collection scans and in-memory sorts. Run on deploy or by
+# hand, outside the request path:
+#
+#   python -m backend_process.bootstrap_db
+#   python -m backend_process.bootstrap_db --check    # verify only, create nothing
+#
+# Exits non-zero when an index is missing or a hot query is not index-backed.
+
+import argparse
+import json
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from db_connection.db import INDEXES, db, ensure_index
+
+# Queries issued on every request of the named path: (label, collection, filter, sort)
+HOT_QUERIES = [
+    ("login / session lookup", "users", {"email": "bootstrap@example.com"}, None),
+    ("latest model for symbol", "trained_models", {"stock_symbol": "AAPL"}, [("trained_on", -1)]),
+    ("portfolio listing", "UserStocks", {"user_id": "bootstrap"}, [("created_at", -1)]),
+    ("portfolio holding", "UserStocks", {"user_id": "bootstrap", "symbol": "AAPL"}, None),
+    ("materialized forecast", "predictions",
+     {"symbol": "AAPL", "as_of": "2000-01-01", "horizon": 7, "model_id": "bootstrap"}, None),
+    ("training job status", "training_jobs", {"job_id": "bootstrap"}, None),
+    ("active training job", "training_jobs", {"symbol": "AAPL", "active": True}, None),
+]
+
+# Plan stages that mean the query is not fully served by an index
+SLOW_STAGES = {"COLLSCAN", "SORT"}
+
+
+def _stages(plan):
+    """Every stage name in a (possibly nested) winning plan"""
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan.get("stage")] if plan.get("stage") else []
+    for key in ("inputStage", "queryPlan"):
+        stages += _stages(plan.get(key))
+    for child in plan.get("inputStages", []):
+        stages += _stages(child)
+    return stages
+
+
+def _index_matches(existing, keys, options):
+    for info in existing.values():
+        if list(info["key"]) != [field for field, _ in keys]:
+            continue
+        if [int(d) for _, d in info["key"]] != [d for _, d in keys]:
+            continue
+        return all(info.get(name) == value for name, value in options.items())
+    return False
+
+
+def _duplicate_emails(limit=5):
+    """Emails held by more than one user, which block the unique index"""
+    pipeline = [
+        {"$group": {"_id": "$email", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": limit},
+    ]
+    return [doc["_id"] for doc in db.users.aggregate(pipeline)]
+
+
+def ensure_indexes(check_only=False):
+    """
+    Create (unless `check_only`) and verify every index in `INDEXES`
+
+    Returns:
+        One result dict per index
+    """
+    results = []
+    for collection, keys, options in INDEXES:
+        result = {"collection": collection, "keys": keys, "options": options}
+        if not check_only:
+            try:
+                result["name"] = ensure_index(collection, keys, options)
+            except Exception as e:
+                result["error"] = str(e)
+                if collection == "users" and options.get("unique"):
+                    result["duplicates"] = _duplicate_emails()
+
+        result["ok"] = _index_matches(db[collection].index_information(), keys, options)
+        print(f"{'✅' if result['ok'] else '❌'} {collection} {keys} {options or ''}"
+              + (f" - {result['error']}" if "error" in result else ""))
+        results.append(result)
+    return results
+
+
+def explain_hot_queries():
+    """
+    Explain every query in `HOT_QUERIES`
+
+    Returns:
+        One report per query with its plan stages and docs examined
+    """
+    reports = []
+    for label, collection, query, sort in HOT_QUERIES:
+        cursor = db[collection].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        explained = cursor.explain()
+
+        stages = _stages(explained.get("queryPlanner", {}).get("winningPlan", {}))
+        stats = explained.get("executionStats", {})
+        report = {
+            "query": label,
+            "collection": collection,
+            "stages": stages,
+            "docs_examined": stats.get("totalDocsExamined"),
+            "keys_examined": stats.get("totalKeysExamined"),
+            "returned": stats.get("nReturned"),
+            "millis": stats.get("executionTimeMillis"),
+            "slow": bool(SLOW_STAGES.intersection(stages)),
+        }
+        print(f"{'⚠️ ' if report['slow'] else '✅'} {label:<26} {' <- '.join(stages)}"
+              f"  (examined {report['docs_examined']} docs)")
+        reports.append(report)
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create and verify MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="Only verify indexes and plans; create nothing")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    print(" Indexes:")
+    indexes = ensure_indexes(check_only=args.check)
+    print("\n Query plans:")
+    plans = explain_hot_queries()
+
+    if args.json:
+        print(json.dumps({"indexes": indexes, "plans": plans}, indent=4, default=str))
+
+    failed = [i for i in indexes if not i["ok"]] + [p for p in plans if p["slow"]]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# ===============================
+# Predictr - Prediction Materializer
+# ===============================
+#
+# Run after market close (e.g. from cron) to precompute forecasts for every
+# tracked symbol, so /api/stocks/predict is served from the `predictions`
+# collection instead of running the model per request.
+#
+#   python -m backend_process.materialize_predictions
+#   python -m backend_process.materialize_predictions --horizons 7,30 AAPL TSLA
+
+import argparse
+import json
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from db_connection.db import db, init_db
+from backend_process.predict_stock import predict_stock_prices, collection as model_collection
+from backend_process.utils.prediction_store import prediction_store, trading_date
+
+# The ranges offered by the dashboard's prediction dropdown
+DEFAULT_HORIZONS = [7, 30, 90, 365]
+
+
+def tracked_symbols():
+    """Every symbol held in a portfolio or with a trained model"""
+    held = db.UserStocks.distinct("symbol")
+    trained = model_collection.distinct("stock_symbol")
+    return sorted({s.upper() for s in held + trained if s})
+
+
+def materialize(symbols, horizons):
+    """
+    Forecast `symbols` once at the longest horizon and store every horizon
+
+    A forecast for N days is a prefix of the forecast for M > N days, so a single
+    batch run covers all horizons.
+    """
+    longest = max(horizons)
+    result = predict_stock_prices(symbols, longest)
+
+    docs = []
+    for symbol, item in result["results"].items():
+        for horizon in horizons:
+            docs.append({"symbol": symbol, "horizon": horizon, "model_id": item["model_id"],
+                         "predictions": item["predictions"][:horizon]})
+
+    written = prediction_store.put_many(docs)
+    return {"symbols": len(symbols), "forecasts": len(result["results"]), "written": written,
+            "errors": result["errors"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute forecasts into the predictions collection")
+    parser.add_argument("symbols", nargs="*", help="Symbols to materialize (default: all tracked symbols)")
+    parser.add_argument("--horizons", default=",".join(str(h) for h in DEFAULT_HORIZONS),
+                        help="Comma-separated forecast lengths in days")
+    args = parser.parse_args(argv)
+
+    init_db()
+    symbols = [s.upper() for s in args.symbols] or tracked_symbols()
+    horizons = sorted({int(h) for h in args.horizons.split(",") if h.strip()})
+
+    started = time.time()
+    print(f" Materializing {len(symbols)} symbols x horizons {horizons} as of {trading_date()}...")
+    summary = materialize(symbols, horizons)
+    summary["seconds"] = round(time.time() - started, 1)
+    print(json.dumps(summary, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,24 @@
 
 
 import os
+import sys
 import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta
-from tensorflow.keras.models import load_model
 from dotenv import load_dotenv
 import json
-from pymongo import MongoClient
+
+# Add the project root to Python path so the script also runs standalone
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from db_connection.db import get_collection
+from backend_process.utils.model_cache import model_cache
+from backend_process.utils.model_registry import model_registry
+from backend_process.utils.price_store import price_store
+from backend_process.utils.dataset_builder import last_window
+from backend_process.utils.feature_engine import feature_cache, scale_features
+from backend_process.utils.numpy_lstm import NumpyLSTMModel
 
 #  Load environment variables
 
@@ -15,15 +26,105 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ENV_PATH = os.path.join(BASE_DIR, ".env")
 load_dotenv(ENV_PATH)
 
-MONGO_URI = os.getenv("MONGO_URI")
-DB_NAME = os.getenv("DB_NAME")
 COLLECTION_NAME = os.getenv("MODEL_COLLECTION", "trained_models")
 
-# Connect to MongoDB
+# MongoDB collection on the shared, per-process client
+collection = get_collection(COLLECTION_NAME)
+
+# Feature models are trained on history from this date; indicators are rebuilt from it too
+FEATURE_HISTORY_START = "2020-01-01"
+
+
+# Roll a model forward from scaled input windows
+
+def forecast_windows(step_fn, windows, days_to_predict, horizon=1, roll_fns=None):
+    """
+    Produce `days_to_predict` scaled values for every row of `windows`.
+
+    `step_fn` maps a (batch, time_steps, features) array to (batch, >= horizon)
+    outputs. Multi-horizon models (horizon > 1) emit `horizon` days per forward
+    pass, so any request up to the horizon is served in a single pass. Longer
+    requests, and older single-output models, roll forward autoregressively:
+    forecast closes are appended to the window, through `roll_fns[i]` when a
+    model needs indicator rows rather than bare closes.
+    """
+    windows = np.asarray(windows, dtype=np.float32)
+    if windows.ndim == 2:
+        windows = windows[..., np.newaxis]
+    batch, time_steps, features = windows.shape
+    # Preallocated buffers: history followed by the rows we forecast
+    buffer = np.empty((batch, time_steps + days_to_predict + horizon, features), dtype=np.float32)
+    buffer[:, :time_steps] = windows
+    forecast = np.empty((batch, days_to_predict + horizon), dtype=np.float32)
+    filled = 0
+
+    while filled < days_to_predict:
+        X_test = buffer[:, filled:filled + time_steps]
+        step = np.asarray(step_fn(X_test)).reshape(batch, -1)[:, :horizon]
+        width = step.shape[1]
+        forecast[:, filled:filled + width] = step
+
+        # Only extend the windows if another pass is needed
+        if filled + width < days_to_predict:
+            rows = buffer[:, time_steps + filled:time_steps + filled + width]
+            for i in range(batch):
+                roll = roll_fns[i] if roll_fns else None
+                if roll is not None:
+                    rows[i] = roll(step[i])
+                elif features == 1:
+                    rows[i, :, 0] = step[i]
+                else:
+                    raise ValueError(f"Cannot forecast past {horizon} days without a feature roller")
+        filled += width
+
+    return forecast[:, :days_to_predict]
+
 
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
-collection = db[COLLECTION_NAME]
+def forecast_from_window(model, window, days_to_predict, horizon=1, roll=None):
+    """Single-window convenience wrapper around forecast_windows"""
+    step_fn = lambda X: model(X, training=False)
+    return forecast_windows(step_fn, [window], days_to_predict, horizon, [roll])[0].tolist()
+
+
+def _serving_path(record):
+    """Prefer the compact memory-mapped artifact; fall back to the .h5 file"""
+    artifact_path = record.get("artifact_path")
+    if artifact_path and os.path.exists(artifact_path) and os.getenv("INFERENCE_ENGINE", "numpy").lower() != "keras":
+        return artifact_path
+    return record["model_path"]
+
+
+def _model_inputs(stock_symbol, record, data):
+    """
+    Scaled input window (time_steps, features) for a model record, plus the
+    roller that extends it past the horizon (None for close-only models).
+    """
+    time_steps = int(record.get("time_steps", 60))
+    features = record.get("features") or ["Close"]
+    scalers = record.get("feature_scalers") or {"Close": [record["scaler_min"], record["scaler_max"]]}
+
+    if features == ["Close"]:
+        rows, roll = data[["Close"]].dropna().to_numpy(), None
+    else:
+        # Indicator rows come from the running cache: O(1) per new bar after the first call
+        rows = feature_cache.rows(
+            stock_symbol, data, features,
+            lambda: price_store.get_history(stock_symbol, start=FEATURE_HISTORY_START, refresh=False)
+        )
+        roll = feature_cache.roller(stock_symbol, features, scalers, data.iloc[-1])
+
+    if len(rows) < time_steps:
+        raise ValueError(f"Not enough historical data; need {time_steps} days, got {len(rows)}")
+    return last_window(scale_features(rows, features, scalers), time_steps)[0], roll
+
+
+def _format_predictions(scaled_predictions, scaler_min, scaler_max, start_date):
+    """Inverse-scale a forecast and attach calendar dates"""
+    predicted_prices = (np.asarray(scaled_predictions) * (scaler_max - scaler_min)) + scaler_min
+    return [
+        {"date": (start_date + timedelta(days=i + 1)).strftime("%Y-%m-%d"), "predicted_close": round(float(price), 2)}
+        for i, price in enumerate(predicted_prices)
+    ]
 
 
 # Predict future stock prices
@@ -31,12 +132,13 @@ collection = db[COLLECTION_NAME]
 def predict_stock_price(stock_symbol, days_to_predict=5):
     print(f"\n Generating predictions for {stock_symbol}...")
 
-    # Find model info in MongoDB
-    record = collection.find_one({"stock_symbol": stock_symbol})
+    # Promoted model info from the in-process registry copy (no Mongo round trip)
+    record = model_registry.current(stock_symbol)
     if not record:
         return {"status": "error", "message": "Model not found for this stock!"}
 
-    model_path = record["model_path"]
+    # The file actually loaded: the .lstmq artifact when present, else the .h5
+    model_path = _serving_path(record)
     
     # === Load the saved scaler values ===
     scaler_min = record.get("scaler_min")
@@ -48,57 +150,31 @@ def predict_stock_price(stock_symbol, days_to_predict=5):
     if not os.path.exists(model_path):
         return {"status": "error", "message": f"Model file missing: {model_path}"}
 
-    # Load trained model
-    model = load_model(model_path)
+    # Reuse the resident model; reloads only if the file or record changed
+    model = model_cache.get(model_path, record)
 
     # Fetch recent 60 days of data
     end_date = datetime.now()
     start_date = end_date - timedelta(days=120) # Fetch more to ensure we have 60 trading days
-    data = yf.download(stock_symbol, start=start_date, end=end_date)
+    data = price_store.get_history(stock_symbol, start=start_date)
 
     if data.empty:
-        return {"status": "error", "message": "No data available from yfinance."}
-
-    close_prices = data["Close"].values.reshape(-1, 1)
-
-    
-    scaled_data = (close_prices - scaler_min) / (scaler_max - scaler_min)
+        return {"status": "error", "message": "No price data available for this stock."}
 
-    if len(scaled_data) < 60:
-        return {"status": "error", "message": f"Not enough historical data; need 60 days, got {len(scaled_data)}"}
-        
-    last_60_days = scaled_data[-60:]
-    predictions = []
+    # Scale with the values stored at training time (features + per-feature min/max)
+    try:
+        window, roll = _model_inputs(stock_symbol, record, data)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
 
-    current_input = last_60_days.copy()
-
-    # Predict next n days
-    for _ in range(days_to_predict):
-        X_test = np.reshape(current_input, (1, current_input.shape[0], 1))
-        pred_price = model.predict(X_test, verbose=0)
-        predictions.append(pred_price[0][0])
-
-        # Append the new predicted value and remove the oldest
-        current_input = np.append(current_input[1:], pred_price)
-        current_input = np.reshape(current_input, (60, 1))
+    horizon = int(record.get("horizon", 1))
+    predictions = forecast_from_window(model, window, days_to_predict, horizon, roll)
 
     #  Manually inverse transform using the *loaded* min/max 
-    scaled_predictions = np.array(predictions).reshape(-1, 1)
-    predicted_prices = (scaled_predictions * (scaler_max - scaler_min)) + scaler_min
-    predicted_prices = predicted_prices.flatten().tolist()
-
-
-    # Create date range for predictions
-    prediction_dates = [(end_date + timedelta(days=i+1)).strftime("%Y-%m-%d") for i in range(days_to_predict)]
-
-    # Combine into results
     results = {
         "status": "success",
         "stock_symbol": stock_symbol,
-        "predictions": [
-            {"date": prediction_dates[i], "predicted_close": round(predicted_prices[i], 2)}
-            for i in range(days_to_predict)
-        ]
+        "predictions": _format_predictions(predictions, scaler_min, scaler_max, end_date)
     }
 
     # Print or return JSON result
@@ -106,11 +182,97 @@ def predict_stock_price(stock_symbol, days_to_predict=5):
     return {
     "status": results["status"],
     "stock_symbol": results["stock_symbol"],
-    "predictions": results["predictions"]
+    "predictions": results["predictions"],
+    "model_id": str(record["_id"])
 }
 
 
 
+# Predict many symbols at once
+
+def predict_stock_prices(symbols, days_to_predict=5):
+    """
+    Forecast several symbols with one registry lookup and one bulk download.
+
+    Symbols whose models share an architecture (time_steps, horizon) are grouped
+    so their input windows travel through the forecast loop as one batch.
+
+    Returns:
+        Dictionary with per-symbol predictions and per-symbol errors
+    """
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    print(f"\n Generating batch predictions for {len(symbols)} symbols...")
+
+    results, errors = {}, {}
+    if not symbols:
+        return {"status": "success", "results": results, "errors": errors}
+
+    # Promoted model records, served from the in-process registry copy
+    records = model_registry.current_many(symbols)
+
+    for symbol in symbols:
+        record = records.get(symbol)
+        if not record:
+            errors[symbol] = "Model not found for this stock!"
+        elif record.get("scaler_min") is None or record.get("scaler_max") is None:
+            errors[symbol] = "Model record is missing scaler min/max values!"
+        elif not os.path.exists(_serving_path(record)):
+            errors[symbol] = f"Model file missing: {_serving_path(record)}"
+    ready = [s for s in symbols if s not in errors]
+    if not ready:
+        return {"status": "success", "results": results, "errors": errors}
+
+    # One batched refresh of the local store covers every symbol
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=120)
+    histories = price_store.get_histories(ready, start=start_date)
+
+    # Group ready symbols by architecture
+    groups = {}
+    for symbol in ready:
+        record = records[symbol]
+        if histories[symbol].empty:
+            errors[symbol] = "No price data available for this stock."
+            continue
+        try:
+            window, roll = _model_inputs(symbol, record, histories[symbol])
+        except ValueError as e:
+            errors[symbol] = str(e)
+            continue
+
+        key = (int(record.get("time_steps", 60)), int(record.get("horizon", 1)), tuple(record.get("features") or ["Close"]))
+        groups.setdefault(key, []).append((symbol, window, roll))
+
+    for (time_steps, horizon, _), members in groups.items():
+        models = [model_cache.get(_serving_path(records[symbol]), records[symbol]) for symbol, _, _ in members]
+
+        if all(isinstance(m, NumpyLSTMModel) for m in models) and len({m.signature() for m in models}) == 1:
+            # Stack the group's weights: row i runs through models[i] in the same matmuls
+            step_fn = NumpyLSTMModel.stack(models).predict
+        else:
+            def step_fn(X, models=models):
+                # Keras models hold their own weights, so each row goes through its own model
+                return np.concatenate([
+                    np.asarray(model(X[i:i + 1], training=False)).reshape(1, -1)
+                    for i, model in enumerate(models)
+                ])
+
+        windows = np.stack([window for _, window, _ in members])
+        roll_fns = [roll for _, _, roll in members]
+        forecasts = forecast_windows(step_fn, windows, days_to_predict, horizon, roll_fns)
+
+        for (symbol, _, _), forecast in zip(members, forecasts):
+            record = records[symbol]
+            results[symbol] = {
+                "stock_symbol": symbol,
+                "predictions": _format_predictions(forecast, record["scaler_min"], record["scaler_max"], end_date),
+                "model_id": str(record["_id"])
+            }
+
+    print(f" Batch prediction completed: {len(results)} ok, {len(errors)} failed")
+    return {"status": "success", "results": results, "errors": errors}
+
+
 # Run manually for testing
 if __name__ == "__main__":
     stock_symbol = input("Enter stock symbol (e.g. AAPL, TSLA): ").upper()
@@ -1,7 +1,9 @@
 # Ishan Coded
 from flask import Blueprint, request, jsonify
-import yfinance as yf
 import requests
+from backend_process.utils.market_data import MarketDataError, get_market_data
+from backend_process.utils.symbol_index import symbol_index
+from backend_process.utils.quote_cache import quote_cache
 
 fetch_stock = Blueprint("fetch_stock", __name__)
 
@@ -12,20 +14,22 @@ def fetch_stock_details():
         return jsonify({"error": "Missing symbol"}), 400
     
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
+        # Same cache as /stocks/get_stock_price, so one search flow costs one Yahoo lookup
+        quote = quote_cache.get(symbol)
 
-        if not info:
+        if not quote:
             return jsonify({"error": "No data found"}), 404
 
         return jsonify({
             "symbol": symbol,
-            "longName": info.get("longName"),
-            "exchange": info.get("exchange"),
-            "currency": info.get("currency"),
-            "sector": info.get("sector"),
-            "currentPrice": info.get("currentPrice")
+            "longName": quote.get("longName"),
+            "exchange": quote.get("exchange"),
+            "currency": quote.get("currency"),
+            "sector": quote.get("sector"),
+            "currentPrice": quote.get("currentPrice")
         })
+    except MarketDataError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -37,31 +41,17 @@ def search_company():
         return jsonify({"error": "No company provided"}), 400
 
     try:
-        url = f"https://query2.finance.yahoo.com/v1/finance/search?q={company}"
-        headers = {
-                  "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                  "AppleWebKit/537.36 (KHTML, like Gecko) "
-                  "Chrome/116.0.0.0 Safari/537.36"
-        }
-        res = requests.get(url, headers=headers, timeout=5)
-        res.raise_for_status()  # Raises HTTPError if status != 200
-
-        data = res.json()
-        results = data.get("quotes", [])
+        # Autocomplete from the local index; the provider is only asked (once) about queries
+        # the index has no match for
+        provider = get_market_data()
+        results, source = symbol_index.lookup(company, provider.search, provider.name)
         if not results:
             return jsonify({"error": "No matches found"}), 404
-
-        out = []
-        for r in results:
-            out.append({
-                "symbol": r.get("symbol"),
-                "shortname": r.get("shortname"),
-                "exchange": r.get("exchange"),
-                "currency": r.get("currency")
-            })
-
-        return jsonify({"results": out})
+        return jsonify({"results": results, "source": source})
     
+    except MarketDataError as e:
+        print("Market data unavailable:", e)
+        return jsonify({"error": "Market data temporarily unavailable"}), 503
     except requests.exceptions.RequestException as e:
         print("Yahoo request failed:", e)
         return jsonify({"error": "Yahoo request failed"}), 500
@@ -1,8 +1,8 @@
 #StockRoutes.py code
 from flask import Blueprint, request, jsonify, session
-from backend_process.train_model import train_lstm_model
-from backend_process.predict_stock import predict_stock_price
 from datetime import datetime
+import csv
+import io
 from db_connection.db import db
 import sys
 import os
@@ -14,6 +14,10 @@ if project_root not in sys.path:
 
 from backend_process.utils.stock_helpers import user_stocks_helper
 from backend_process.utils.user_helpers import user_helper
+from backend_process.utils.training_jobs import training_jobs
+from backend_process.utils.quote_cache import quote_cache, quotes_to_columns
+from backend_process.utils.fx_rates import fx_rates
+from backend_process.utils.market_data import MarketDataError
 
 stock_routes = Blueprint("stock_routes", __name__)
 
@@ -145,6 +149,61 @@ def remove_stock():
         return jsonify({"error": result["error"]}), 400
 
 
+def _csv_rows(text):
+    """CSV with a header row -> list of dicts, blank cells left out"""
+    return [{k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}
+            for row in csv.DictReader(io.StringIO(text))]
+
+
+# ===== Import Many Stocks (CSV or JSON) =====
+@stock_routes.route("/stocks/import", methods=["POST"])
+def import_stocks():
+    """
+    Add or update holdings in bulk
+
+    Accepts a CSV upload (`file` form field), a text/csv body with a header row
+    (symbol,qty,buy_price,...), or a JSON array of stock objects (or {"stocks": [...]}).
+    """
+    payload = request.get_json(silent=True) if request.is_json else None
+
+    # Try to get user_id from multiple sources
+    user_id = session.get("user_id") or request.values.get("user_id")
+    if not user_id and isinstance(payload, dict):
+        user_id = payload.get("user_id")
+
+    # If no user_id, try to get it from email in session
+    if not user_id and session.get("user"):
+        user_id = user_helper.get_user_id_by_email(session.get("user"))
+        if user_id:
+            session["user_id"] = user_id
+
+    if not user_id:
+        return jsonify({"error": "Missing user_id - please log in"}), 401
+
+    if "file" in request.files:
+        rows = _csv_rows(request.files["file"].read().decode("utf-8-sig"))
+    elif payload is not None:
+        rows = payload.get("stocks") if isinstance(payload, dict) else payload
+    elif request.mimetype == "text/csv":
+        rows = _csv_rows(request.get_data(as_text=True))
+    else:
+        return jsonify({"error": "Send a CSV file or a JSON array of stocks"}), 400
+
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return jsonify({"error": "Expected a list of stock objects"}), 400
+    max_rows = int(os.getenv("IMPORT_MAX_ROWS", "10000"))
+    if len(rows) > max_rows:
+        return jsonify({"error": f"At most {max_rows} rows per import"}), 400
+
+    # One unordered bulk write for the whole file
+    result = user_stocks_helper.import_stocks(user_id, rows)
+
+    if result["success"]:
+        return jsonify({k: v for k, v in result.items() if k != "success"}), 200
+    else:
+        return jsonify({"error": result["error"], "skipped": result.get("skipped", [])}), 400
+
+
 # ===== Get Stock Price (Real-time) =====
 @stock_routes.route("/stocks/get_stock_price", methods=["POST"])
 def get_stock_price():
@@ -156,120 +215,89 @@ def get_stock_price():
         if not symbol:
             return jsonify({"error": "Symbol is required"}), 400
         
-        # Import yfinance here to avoid loading it if not needed
-        try:
-            import yfinance as yf
-        except ImportError:
-            return jsonify({"error": "yfinance not installed"}), 500
-        
-        # Fetch stock data
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        hist = ticker.history(period="1d")
+        # Shared quote cache: the market data provider is only hit on a miss or by a background refresh.
+        # A miss fetches company details and the latest bar concurrently, under the provider's timeout
+        quote = quote_cache.get(symbol)
         
-        if hist.empty or not info:
+        if not quote:
             return jsonify({"error": f"No data found for symbol {symbol}"}), 404
         
-        # Get current price (most recent close)
-        current_price = hist['Close'].iloc[-1] if not hist.empty else None
-        
-        if current_price is None:
-            return jsonify({"error": f"Unable to fetch current price for {symbol}"}), 404
+        stock_data = {k: v for k, v in quote.items() if k != "fetched_at"}
+        stock_data["timestamp"] = datetime.fromtimestamp(quote["fetched_at"]).isoformat()
         
-        # Extract useful information
-        stock_data = {
-            "symbol": symbol,
-            "currentPrice": round(float(current_price), 2),
-            "longName": info.get("longName", ""),
-            "exchange": info.get("exchange", ""),
-            "currency": info.get("currency", "USD"),
-            "sector": info.get("sector", ""),
-            "previousClose": info.get("previousClose"),
-            "marketCap": info.get("marketCap"),
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        print(f"Fetched price for {symbol}: ${current_price}")
+        print(f"Fetched price for {symbol}: ${quote['currentPrice']}")
         return jsonify(stock_data), 200
         
+    except MarketDataError as e:
+        # No cached price to fall back on and the provider refused or timed out
+        print(f" Market data unavailable: {str(e)}")
+        return jsonify({"error": f"Market data temporarily unavailable: {str(e)}"}), 503
+
     except Exception as e:
         print(f" Error fetching stock price: {str(e)}")
         return jsonify({"error": f"Failed to fetch stock price: {str(e)}"}), 500
 
 
+# ===== Get Many Stock Prices (one upstream call) =====
+@stock_routes.route("/stocks/quotes", methods=["GET"])
+def get_stock_quotes():
+    """Current prices for ?symbols=AAPL,TSLA,... as one columnar payload"""
+    try:
+        symbols = [s for s in request.args.get("symbols", "").upper().split(",") if s.strip()]
+        if not symbols:
+            return jsonify({"error": "symbols is required"}), 400
+        max_symbols = int(os.getenv("QUOTES_MAX_SYMBOLS", "200"))
+        if len(symbols) > max_symbols:
+            return jsonify({"error": f"At most {max_symbols} symbols per request"}), 400
+
+        # Cached quotes are reused; everything else comes from one multi-ticker download
+        quotes = quote_cache.get_many(symbols)
+
+        return jsonify({**quotes_to_columns(quotes), "timestamp": datetime.now().isoformat()}), 200
+
+    except Exception as e:
+        print(f" Error fetching stock quotes: {str(e)}")
+        return jsonify({"error": f"Failed to fetch stock quotes: {str(e)}"}), 500
+
+
 # ===== Get Live Exchange Rates =====
 @stock_routes.route("/exchange-rates", methods=["GET"])
 def get_exchange_rates():
-    """Fetch live exchange rates from ExchangeRate-API"""
-    try:
-        import requests
-        import os
-        
-        # Get API key from environment variable
-        api_key = os.getenv('EXCHANGE_RATE_API_KEY')
-        
-        if not api_key:
-            print("⚠️ EXCHANGE_RATE_API_KEY not found in environment, using default rates")
-            # Return default rates if no API key
-            return jsonify({
-                "rates": {
-                    "USD": 1,
-                    "EUR": 0.92,
-                    "GBP": 0.78,
-                    "INR": 84
-                },
-                "timestamp": datetime.now().isoformat(),
-                "source": "default"
-            }), 200
-        
-        # Fetch from ExchangeRate-API
-        url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/USD"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            if data.get("result") == "success":
-                print("Successfully fetched live exchange rates")
-                return jsonify({
-                    "rates": data.get("conversion_rates", {}),
-                    "timestamp": data.get("time_last_update_utc"),
-                    "source": "exchangerate-api.com"
-                }), 200
-            else:
-                print(f"ExchangeRate-API error: {data.get('error-type')}")
-                raise Exception(f"API returned error: {data.get('error-type')}")
-        else:
-            raise Exception(f"HTTP {response.status_code}: {response.text}")
-            
-    except Exception as e:
-        print(f" Error fetching exchange rates: {str(e)}")
-        # Return default rates on error
-        return jsonify({
-            "rates": {
-                "USD": 1,
-                "EUR": 0.92,
-                "GBP": 0.78,
-                "INR": 84
-            },
-            "timestamp": datetime.now().isoformat(),
-            "source": "default (error)",
-            "error": str(e)
-        }), 200  # Return 200 with default rates instead of error
+    """Serve the process's cached exchange rates (refreshed in the background)"""
+    snapshot = fx_rates.snapshot()
+    payload = {
+        "rates": snapshot["rates"],
+        "timestamp": snapshot["timestamp"],
+        "source": snapshot["source"],
+        "stale": snapshot["stale"],
+    }
+    if "error" in snapshot:
+        payload["error"] = snapshot["error"]
+    return jsonify(payload), 200  # Stale or default rates are still a usable answer
     
-# Train Model Route
+# Train Model Route (queued; poll /train/jobs/<job_id> for progress)
 @stock_routes.route('/train/<symbol>', methods=['POST'])
 def train_stock_model(symbol):
     try:
-        result = train_lstm_model(symbol.upper())
-        return jsonify(result)
+        incremental = request.args.get("incremental", "false").lower() == "true"
+        job = training_jobs.submit(symbol.upper(), incremental=incremental)
+        return jsonify(job), 202
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
+
+# Training Job Status Route
+@stock_routes.route('/train/jobs/<job_id>', methods=['GET'])
+def training_job_status(job_id):
+    job = training_jobs.get_job(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify(job)
     
 # Predict Future Prices Route
 @stock_routes.route('/predict/<symbol>', methods=['GET'])
 def predict_stock(symbol):
     try:
+        from backend_process.predict_stock import predict_stock_price
         result = predict_stock_price(symbol.upper())
         return jsonify(result)
     except Exception as e:
@@ -1,6 +1,7 @@
 # Vrushali Coded
 from flask import Blueprint, request, jsonify
-import yfinance as yf  # Yahoo Finance Python package 
+from backend_process.utils.quote_cache import quote_cache
+from backend_process.utils.market_data import MarketDataError
 
 fetch_stock = Blueprint("fetch_stock", __name__)
 
@@ -12,11 +13,8 @@ def fetch_stock_details():
         return jsonify({"error": "Missing symbol"}), 400  #error if none
 
     try:
-        # creating stock object using yfinance
-        stock = yf.Ticker(symbol)
-
-        # storing stock info in dict
-        info = stock.info
+        # quote from the shared cache (yfinance is only called on a miss)
+        info = quote_cache.get(symbol)
 
         # error return 
         if not info:
@@ -35,6 +33,10 @@ def fetch_stock_details():
         # sent to website in JSON format
         return jsonify(data)
 
+    except MarketDataError as e:
+        # company details could not be fetched in time
+        return jsonify({"error": str(e)}), 503
+
     except Exception as e:
         # exception if data fetching fails 
         return jsonify({"error": str(e)}), 500
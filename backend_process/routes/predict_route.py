@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
-from backend_process.predict_stock import predict_stock_price
+from backend_process.utils.prediction_store import prediction_store, model_id
+from backend_process.utils.model_registry import model_registry
 
 predict_bp = Blueprint("predict_bp", __name__)
 
@@ -12,23 +13,66 @@ def predict_stock_api():
 
         if not symbol:
             return jsonify({"error": "Missing stock symbol"}), 400
+        symbol = symbol.strip().upper()
 
-        result = predict_stock_price(symbol, days)
+        # Serve the forecast materialized after market close by the model promoted now;
+        # run the model only on a miss
+        cached = prediction_store.get(symbol, days, model_id(model_registry.current(symbol)))
+        if cached:
+            predictions, source = cached["predictions"], "materialized"
+        else:
+            # Model code is imported on the first cache miss, not at startup
+            from backend_process.predict_stock import predict_stock_price
+            result = predict_stock_price(symbol, days)
 
-        if result.get("status") == "error":
-            return jsonify({"error": result.get("message")}), 400
+            if result.get("status") == "error":
+                return jsonify({"error": result.get("message")}), 400
+
+            predictions, source = result["predictions"], "live"
+            prediction_store.put(symbol, days, predictions, result["model_id"])
 
         formatted_predictions = [
             {"date": p["date"], "price": p["predicted_close"]}
-            for p in result["predictions"]
+            for p in predictions
         ]
 
         return jsonify({
             "predictions": formatted_predictions,
             "future_value": formatted_predictions[-1]["price"],
-            "accuracy": 95
+            "accuracy": 95,
+            "source": source
         })
 
     except Exception as e:
         print("❌ Error in prediction API:", e)
         return jsonify({"error": str(e)}), 500
+
+@predict_bp.route("/api/stocks/predict_batch", methods=["POST"])
+def predict_batch_api():
+    try:
+        data = request.get_json() or {}
+        symbols = data.get("symbols") or []
+        days = int(data.get("days", 7))
+
+        if isinstance(symbols, str):
+            symbols = symbols.split(",")
+        if not symbols:
+            return jsonify({"error": "Missing stock symbols"}), 400
+
+        from backend_process.predict_stock import predict_stock_prices
+        result = predict_stock_prices(symbols, days)
+
+        predictions = {}
+        for symbol, item in result["results"].items():
+            formatted = [{"date": p["date"], "price": p["predicted_close"]} for p in item["predictions"]]
+            predictions[symbol] = {
+                "predictions": formatted,
+                "future_value": formatted[-1]["price"] if formatted else None,
+                "accuracy": 95
+            }
+
+        return jsonify({"predictions": predictions, "errors": result["errors"]})
+
+    except Exception as e:
+        print("❌ Error in batch prediction API:", e)
+        return jsonify({"error": str(e)}), 500
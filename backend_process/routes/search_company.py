@@ -1,6 +1,8 @@
 
 from flask import Blueprint, request, jsonify
 import requests
+from backend_process.utils.market_data import MarketDataError, get_market_data
+from backend_process.utils.symbol_index import symbol_index
 
 fetch_stock = Blueprint("fetch_stock", __name__)
 
@@ -12,43 +14,21 @@ def search_company():
         return jsonify({"error": "No company provided"}), 400
 
     try:
-        # Yahoo search API URL
-        url = f"https://query2.finance.yahoo.com/v1/finance/search?q={company}"
-
-        # FLASK request as normal browser
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/116.0.0.0 Safari/537.36"
-            )
-        }
-
-        # Yahoo request
-        res = requests.get(url, headers=headers, timeout=5)
-        res.raise_for_status()  # raise error if request failed
-
-        # JSON conversion
-        data = res.json()
-
-        # extracting result 
-        results = data.get("quotes", [])
+        # local index first; the provider (Yahoo, or the local listing when offline) is asked
+        # once per query, and only when the index has no match at all
+        provider = get_market_data()
+        results, source = symbol_index.lookup(company, provider.search, provider.name)
         if not results:
             return jsonify({"error": "No matches found"}), 404
 
-        # small list of info
-        out = []
-        for r in results:
-            out.append({
-                "symbol": r.get("symbol"),
-                "shortname": r.get("shortname"),
-                "exchange": r.get("exchange"),
-                "currency": r.get("currency")
-            })
-
         # returns in json format
-        return jsonify({"results": out})
+        return jsonify({"results": results, "source": source})
     
+    except MarketDataError as e:
+        # Nothing local and the provider could not be asked (timeout or open circuit)
+        print("Market data unavailable:", e)
+        return jsonify({"error": "Market data temporarily unavailable"}), 503
+
     except requests.exceptions.RequestException as e:
         # Handles connection issues, timeouts, etc.
         print("Yahoo request failed:", e)
@@ -0,0 +1,51 @@
+import json
+import os
+import time
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from backend_process.utils.quote_cache import quotes_to_columns
+from backend_process.utils.quote_stream import quote_stream
+
+stream_bp = Blueprint("stream_bp", __name__)
+
+# Comment line sent when nothing changed, so proxies keep the connection open
+HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "20"))
+# Streams end after this long; EventSource reconnects on its own
+MAX_STREAM_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", "3600"))
+
+
+def _event(name, payload):
+    return f"event: {name}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+# ===== Live Quotes (Server-Sent Events) =====
+@stream_bp.route("/stream/quotes", methods=["GET"])
+def stream_quotes():
+    """Push price changes for ?symbols=AAPL,TSLA,... as `quotes` events"""
+    symbols = [s for s in request.args.get("symbols", "").upper().split(",") if s.strip()]
+    if not symbols:
+        return jsonify({"error": "symbols is required"}), 400
+    max_symbols = int(os.getenv("QUOTES_MAX_SYMBOLS", "200"))
+    if len(symbols) > max_symbols:
+        return jsonify({"error": f"At most {max_symbols} symbols per request"}), 400
+
+    subscription = quote_stream.subscribe(symbols)
+
+    def generate():
+        started = time.time()
+        try:
+            yield "retry: 5000\n\n"
+            while time.time() - started < MAX_STREAM_SECONDS:
+                update = subscription.next(timeout=HEARTBEAT_SECONDS)
+                if update is None:
+                    yield ": ping\n\n"
+                else:
+                    yield _event("quotes", quotes_to_columns(update))
+        finally:
+            # Runs when the client disconnects or the stream times out
+            quote_stream.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
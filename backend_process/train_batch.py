@@ -0,0 +1,153 @@
+# ===============================
+# Predictr - Batch Model Trainer
+# ===============================
+#
+# Trains many symbols in parallel, one TensorFlow process per worker.
+#
+#   python -m backend_process.train_batch AAPL TSLA MSFT
+#   python -m backend_process.train_batch --file symbols.txt --workers 8
+#
+# Progress is checkpointed to a state file, so re-running the same command
+# after a crash resumes with the symbols that have not finished yet.
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+DEFAULT_STATE_FILE = os.path.join(project_root, "models", "train_batch_state.json")
+
+
+def _init_worker(threads):
+    # Must run before TensorFlow is imported in this process
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _train_one(symbol, epochs, force, incremental):
+    """Train one symbol inside a worker process and describe the outcome"""
+    from backend_process.train_model import train_lstm_model, load_training_history
+    from backend_process.utils.model_registry import model_registry
+
+    started = time.time()
+    try:
+        history = load_training_history(symbol)
+        if history.empty:
+            return {"symbol": symbol, "status": "failed", "reason": "No stock data", "seconds": time.time() - started}
+
+        last_date = history.index[-1].strftime("%Y-%m-%d")
+        latest = model_registry.lookup(symbol)
+        if not force and latest and latest.get("data_last_date") == last_date and latest.get("data_rows") == len(history):
+            return {"symbol": symbol, "status": "skipped", "reason": f"no new data since {last_date}",
+                    "seconds": time.time() - started}
+
+        result = train_lstm_model(symbol, epochs=epochs, incremental=incremental)
+        result.update({"symbol": symbol, "seconds": time.time() - started})
+        return result
+    except Exception as e:
+        return {"symbol": symbol, "status": "failed", "reason": str(e), "seconds": time.time() - started}
+
+
+def _load_state(path, symbols):
+    """Return finished results from a previous run over the same symbol list"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("symbols") != symbols:
+        return {}
+    return state.get("finished", {})
+
+
+def _save_state(path, symbols, finished):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"symbols": symbols, "finished": finished, "updated": datetime.now().isoformat()}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_symbols(args):
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file) as f:
+            for line in f:
+                symbols.extend(part for part in line.replace(",", " ").split() if not part.startswith("#"))
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+
+
+def _print_summary(symbols, finished):
+    print(f"\n{'SYMBOL':<10} {'STATUS':<8} {'WALL(s)':>8} {'EPOCHS':>7} {'LOSS':>10}  NOTE")
+    for symbol in symbols:
+        r = finished.get(symbol, {"status": "pending"})
+        loss = r.get("final_loss")
+        print(f"{symbol:<10} {r['status']:<8} {r.get('seconds', 0):>8.1f} {r.get('trained_epochs', '-'):>7} "
+              f"{(f'{loss:.6f}' if loss is not None else '-'):>10}  {r.get('reason', '')}")
+    counts = {}
+    for r in finished.values():
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    print(f"\n{len(finished)}/{len(symbols)} finished: {json.dumps(counts)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train LSTM models for many symbols in parallel")
+    parser.add_argument("symbols", nargs="*", help="Stock symbols to train")
+    parser.add_argument("--file", help="File with symbols (whitespace, comma or newline separated)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel training processes")
+    parser.add_argument("--threads-per-worker", type=int, default=1, help="TensorFlow threads per process")
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--state-file", default=DEFAULT_STATE_FILE, help="Checkpoint used to resume a crashed run")
+    parser.add_argument("--force", action="store_true", help="Retrain even if the data has not changed")
+    parser.add_argument("--incremental", action="store_true", help="Fine-tune the previous model on new bars")
+    parser.add_argument("--fresh", action="store_true", help="Ignore the checkpoint from a previous run")
+    args = parser.parse_args(argv)
+
+    symbols = _read_symbols(args)
+    if not symbols:
+        parser.error("no symbols given")
+
+    finished = {} if args.fresh else _load_state(args.state_file, symbols)
+    # Failed symbols are retried on resume
+    finished = {s: r for s, r in finished.items() if r.get("status") != "failed"}
+    pending = [s for s in symbols if s not in finished]
+    print(f" Training {len(pending)} symbols ({len(finished)} already done) "
+          f"on {args.workers} workers x {args.threads_per_worker} threads")
+
+    # spawn: each worker gets its own TensorFlow runtime and Mongo client
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context,
+                             initializer=_init_worker, initargs=(args.threads_per_worker,)) as pool:
+        futures = {pool.submit(_train_one, s, args.epochs, args.force, args.incremental): s for s in pending}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"symbol": symbol, "status": "failed", "reason": str(e)}
+            finished[symbol] = result
+            _save_state(args.state_file, symbols, finished)
+            print(f" [{len(finished)}/{len(symbols)}] {symbol}: {result['status']}")
+
+    _print_summary(symbols, finished)
+    return 0 if all(r["status"] != "failed" for r in finished.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
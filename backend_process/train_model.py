@@ -3,15 +3,26 @@
 # ===============================
 
 import os
+import sys
 import numpy as np
-import yfinance as yf
 from datetime import datetime
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential
+from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping
-from pymongo import MongoClient
+from tensorflow.keras.optimizers import Adam
 from dotenv import load_dotenv
+
+# Add the project root to Python path so the script also runs standalone
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend_process.utils.price_store import price_store
+from backend_process.utils.model_registry import model_registry
+from backend_process.utils.dataset_builder import make_windows, make_tf_dataset
+from backend_process.utils.numpy_lstm import NumpyLSTMModel
+from backend_process.utils.model_artifacts import accuracy_report, artifact_path_for, export_artifact, load_artifact
+from backend_process.utils.feature_engine import DEFAULT_FEATURES, compute_features, fit_scalers, scale_features, validate_features
 import json
 
 
@@ -19,57 +30,245 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ENV_PATH = os.path.join(BASE_DIR, ".env")
 load_dotenv(ENV_PATH)
 
-# Fetch MongoDB connection details
-MONGO_URI = os.getenv("MONGO_URI")     
-DB_NAME = os.getenv("DB_NAME")         
-COLLECTION_NAME = os.getenv("MODEL_COLLECTION", "trained_models")
+# Histories with more windows than this are streamed through tf.data
+STREAM_THRESHOLD = int(os.getenv("TRAIN_STREAM_THRESHOLD", "20000"))
+
+# Newest windows held out of training and used to score a model (val_loss)
+VAL_WINDOWS = int(os.getenv("TRAIN_VAL_WINDOWS", "60"))
+
+# How far (as a fraction of the stored price range) new prices may fall outside
+# the stored scaler before a warm start is abandoned for a full retrain
+SCALER_DRIFT_TOLERANCE = float(os.getenv("SCALER_DRIFT_TOLERANCE", "0.05"))
+
+# Weight format of the compact artifact served to web workers: float32, float16 or int8
+ARTIFACT_DTYPE = os.getenv("MODEL_ARTIFACT_DTYPE", "float16")
+
+# Model input columns, e.g. TRAIN_FEATURES=Close,Volume,RSI_14 (Close must be first)
+TRAIN_FEATURES = os.getenv("TRAIN_FEATURES", ",".join(DEFAULT_FEATURES)).split(",")
+
+
+def load_training_history(stock_symbol):
+    """Daily bars a training run sees: 2020-01-01 up to (not including) today"""
+    return price_store.get_history(stock_symbol, start="2020-01-01", end=datetime.now().strftime("%Y-%m-%d"))
+
+
+def _holdout_split(n_windows, horizon, n_val):
+    """
+    Index where training windows end, and where the held-out windows start
+
+    The newest `n_val` windows are held out. The `horizon - 1` windows just
+    before them are dropped too, because their targets overlap the held-out targets.
+
+    Returns:
+        (train_end, val_start); val_start == n_windows when the history is too short to hold any out
+    """
+    train_end = n_windows - n_val - (horizon - 1)
+    if n_val == 0 or train_end < 1:
+        return n_windows, n_windows
+    return train_end, n_windows - n_val
+
+
+def _finetune_split(n_windows, new_rows, horizon, n_val):
+    """
+    Window ranges for a warm start: fit on the new bars, score on the previous holdout
 
-# Check if environment variables loaded
-if not MONGO_URI or not DB_NAME:
-    raise ValueError("MongoDB connection details not found in .env file!")
+    The newest `new_rows` windows are the ones whose targets end on bars the
+    previous model has not seen; they are the fine-tuning set. Scoring uses the
+    `n_val` windows just before them (the windows the previous run held out),
+    minus the `horizon - 1` whose targets overlap the new windows' targets.
 
-#  MongoDB Connection
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
-collection = db[COLLECTION_NAME]
+    Returns:
+        (train_start, val_start, val_end); val_start == val_end when nothing is left to score on
+    """
+    train_start = max(n_windows - new_rows, 0)
+    val_end = max(train_start - (horizon - 1), 0)
+    return train_start, max(val_end - n_val, 0), val_end
+
+
+def _holdout_loss(model, val_data):
+    """MSE on held-out windows, comparable across full and warm-start runs"""
+    X_val, y_val = val_data
+    if len(X_val) == 0:
+        return None
+    return float(model.evaluate(np.asarray(X_val), np.asarray(y_val), verbose=0))
+
+
+def _save_model(model, stock_symbol, data, features, scalers, time_steps, horizon, history, val_loss, mode, val_data):
+    """Write a new model version, register its record and promote it"""
+    # Every run gets its own directory, so served files are never overwritten
+    version = model_registry.next_version(stock_symbol)
+    model_path = os.path.join(model_registry.version_dir(stock_symbol, version), f"{stock_symbol}_lstm.h5")
+    model.save(model_path)
+
+    # Web workers serve this file with the NumPy engine; check it agrees with Keras
+    probe = np.random.default_rng(0).random((8, time_steps, len(features)), dtype=np.float32)
+    reference = NumpyLSTMModel.from_h5(model_path)
+    engine_diff = float(np.max(np.abs(np.asarray(model(probe, training=False)) - reference.predict(probe))))
+    if engine_diff > 1e-4:
+        print(f"⚠️ NumPy engine differs from Keras by {engine_diff:.2e} for {model_path}")
+
+    # Compact, memory-mappable copy of the weights plus its accuracy cost on the held-out windows
+    artifact_path = export_artifact(reference, artifact_path_for(model_path), ARTIFACT_DTYPE)
+    X_val, y_val = val_data
+    if len(X_val) == 0:
+        X_val, y_val = probe, None  # history too short to hold windows out
+    quantization = accuracy_report(reference, load_artifact(artifact_path), np.asarray(X_val), y_val,
+                                   price_scale=scalers["Close"][1] - scalers["Close"][0])
+    print(f" Exported {ARTIFACT_DTYPE} artifact {artifact_path}: {json.dumps(quantization)}")
+
+    # Store training details in MongoDB
+    model_record = {
+        "stock_symbol": stock_symbol,
+        "version": version,
+        "trained_on": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "epochs": len(history.history["loss"]),
+        "model_path": model_path,
+        "artifact_path": artifact_path,
+        "artifact_dtype": ARTIFACT_DTYPE,
+        "quantization_report": quantization,
+        "scaler_min": float(scalers["Close"][0]),
+        "scaler_max": float(scalers["Close"][1]),
+        "features": list(features),
+        "feature_scalers": scalers,
+        "time_steps": time_steps,
+        "horizon": horizon,
+        "final_loss": float(min(history.history["loss"])),  # best weights are restored
+        "val_loss": val_loss,
+        "mode": mode,
+        "engine_max_abs_diff": engine_diff,
+        "data_last_date": data.index[-1].strftime("%Y-%m-%d"),
+        "data_rows": int(len(data)),
+    }
+    model_registry.register(model_record)
+    model_registry.promote(stock_symbol, version)
+
+    print(f" Model trained and saved ({mode}): {model_path}")
+    return {
+        "status": "success",
+        "version": version,
+        "model_path": model_path,
+        "trained_epochs": len(history.history['loss']),
+        "final_loss": model_record["final_loss"],
+        "val_loss": val_loss,
+        "horizon": horizon,
+        "mode": mode,
+    }
+
+
+def _finetune_latest(stock_symbol, data, features, time_steps, horizon, finetune_epochs, degrade_threshold, callbacks):
+    """
+    Warm-start from the symbol's latest model and fit only the recent bars.
+
+    The model is fine-tuned on the windows that end on bars it has not seen
+    and scored, before and after, on the windows the previous run held out,
+    so a fine-tune that forgets older behaviour is caught.
+
+    Returns the training result, or None when a full retrain is required
+    (no usable previous model, scaler drift, or degraded validation loss).
+    """
+    latest = model_registry.lookup(stock_symbol)
+    if not latest or not os.path.exists(latest.get("model_path", "")):
+        print(f" No previous model for {stock_symbol}; running a full retrain.")
+        return None
+    if int(latest.get("time_steps", 60)) != time_steps or int(latest.get("horizon", 1)) != horizon \
+            or (latest.get("features") or ["Close"]) != features:
+        print(f" Previous {stock_symbol} model has a different shape; running a full retrain.")
+        return None
+
+    # Bars the previous model has not seen, plus the previous holdout and enough history to window both
+    last_date = latest.get("data_last_date")
+    new_rows = int((data.index > last_date).sum()) if last_date else VAL_WINDOWS
+    if new_rows == 0:
+        print(f" {stock_symbol} model is already up to date with {last_date}.")
+        return {"status": "success", "version": latest.get("version"), "model_path": latest["model_path"], "trained_epochs": 0,
+                "final_loss": latest.get("final_loss"), "val_loss": latest.get("val_loss"),
+                "horizon": horizon, "mode": "up_to_date"}
+    # Indicators are computed over the full history so they match the original run
+    recent = compute_features(data, features).tail(new_rows + VAL_WINDOWS + horizon - 1 + time_steps + horizon - 1)
+
+    # The stored scalers are part of the model; reuse them unless any feature escaped its range
+    scalers = latest.get("feature_scalers") or {"Close": [latest["scaler_min"], latest["scaler_max"]]}
+    for feature in features:
+        if feature not in scalers:
+            print(f" Previous {stock_symbol} model has no scaler for {feature}; running a full retrain.")
+            return None
+        scaler_min, scaler_max = scalers[feature]
+        span = scaler_max - scaler_min
+        values = recent[feature].values
+        if values.min() < scaler_min - SCALER_DRIFT_TOLERANCE * span or \
+                values.max() > scaler_max + SCALER_DRIFT_TOLERANCE * span:
+            print(f" {stock_symbol} {feature} drifted outside the stored scaler range; running a full retrain.")
+            return None
+
+    scaled_data = scale_features(recent, features, scalers)
+    X, y = make_windows(scaled_data, time_steps, horizon)
+    train_start, val_start, val_end = _finetune_split(len(X), new_rows, horizon, VAL_WINDOWS)
+    X_train, y_train = np.asarray(X[train_start:]), np.asarray(y[train_start:])
+    val_data = (X[val_start:val_end], y[val_start:val_end])
+
+    model = load_model(latest["model_path"], compile=False)
+    model.compile(optimizer=Adam(learning_rate=1e-4), loss='mean_squared_error')
+    # Score the previous model on the same held-out windows, so before and after are comparable
+    reference = _holdout_loss(model, val_data)
+    history = model.fit(X_train, y_train, epochs=finetune_epochs, batch_size=32,
+                        callbacks=list(callbacks or []), verbose=1)
+
+    val_loss = _holdout_loss(model, val_data)
+    if reference is not None and val_loss > reference * (1 + degrade_threshold):
+        print(f" Fine-tuned {stock_symbol} held-out loss {val_loss:.6f} degraded past {reference:.6f}; running a full retrain.")
+        return None
+
+    return _save_model(model, stock_symbol, data, features, scalers, time_steps, horizon,
+                       history, val_loss, "incremental", val_data)
 
 
 # Function: Train LSTM Model
-def train_lstm_model(stock_symbol, epochs=50, time_steps=60):
+def train_lstm_model(stock_symbol, epochs=50, time_steps=60, horizon=7, callbacks=None, streaming=None,
+                     incremental=False, finetune_epochs=3, degrade_threshold=0.2, features=None):
     print(f"\n Training started for {stock_symbol}...")
 
-    # Fetch historical stock data
-    data = yf.download(stock_symbol, start="2020-01-01", end=datetime.now().strftime("%Y-%m-%d"))
+    # Fetch historical stock data (local store, topped up with any missing bars)
+    data = load_training_history(stock_symbol)
 
     if data.empty:
         print(f" No data found for {stock_symbol}.")
         return {"status": "failed", "reason": "No stock data"}
 
-    # Use only closing prices
-    close_prices = data['Close'].values.reshape(-1, 1)
+    features = validate_features(features or TRAIN_FEATURES)
 
-    # Normalize the data
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(close_prices)
+    # Fine-tune yesterday's model on the new bars when asked to
+    if incremental:
+        result = _finetune_latest(stock_symbol, data, features, time_steps, horizon, finetune_epochs,
+                                  degrade_threshold, callbacks)
+        if result is not None:
+            return result
 
-    # Create training sequences
-    X_train, y_train = [], []
-    for i in range(time_steps, len(scaled_data)):
-        X_train.append(scaled_data[i - time_steps:i, 0])
-        y_train.append(scaled_data[i, 0])
+    # Price and indicator columns in one vectorized pass
+    feature_frame = compute_features(data, features)
 
-    X_train, y_train = np.array(X_train), np.array(y_train)
-    X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))
+    # Normalize each feature to 0-1; the min/max pairs are stored with the model
+    scalers = fit_scalers(feature_frame)
+    scaled_data = scale_features(feature_frame, features, scalers)
+
+    # Create training sequences (strided views); each target is the next `horizon` closes.
+    # The newest windows are held out to measure val_loss.
+    X, y = make_windows(scaled_data, time_steps, horizon)
+    # Short histories hold out at most a fifth of their windows
+    train_end, val_start = _holdout_split(len(X), horizon, min(VAL_WINDOWS, len(X) // 5))
+    X_train, y_train = X[:train_end], y[:train_end]
+    val_data = (X[val_start:], y[val_start:])
+    if streaming is None:
+        streaming = len(X_train) > STREAM_THRESHOLD
 
     
     #Build the LSTM Model
     
     model = Sequential([
-        LSTM(50, return_sequences=True, input_shape=(X_train.shape[1], 1)),
+        LSTM(50, return_sequences=True, input_shape=(time_steps, X_train.shape[2])),
         Dropout(0.2),
         LSTM(50, return_sequences=False),
         Dropout(0.2),
-        Dense(1)
+        Dense(horizon)  # direct multi-day head: one forward pass per forecast
     ])
 
     model.compile(optimizer='adam', loss='mean_squared_error')
@@ -79,28 +278,19 @@ def train_lstm_model(stock_symbol, epochs=50, time_steps=60):
 
    
     # Train the Model
-    history = model.fit(X_train, y_train, epochs=epochs, batch_size=32, callbacks=[early_stop], verbose=1)
+    fit_callbacks = [early_stop] + list(callbacks or [])
+    if streaming:
+        # Rows up to the last training window's target, so held-out windows stay unseen
+        dataset = make_tf_dataset(scaled_data[:train_end + time_steps + horizon - 1], time_steps, horizon, batch_size=32)
+        history = model.fit(dataset, epochs=epochs, callbacks=fit_callbacks, verbose=1)
+    else:
+        history = model.fit(X_train, y_train, epochs=epochs, batch_size=32, callbacks=fit_callbacks, verbose=1)
 
    
     # Save Model 
-    model_dir = "models"
-    os.makedirs(model_dir, exist_ok=True)
-    model_path = os.path.join(model_dir, f"{stock_symbol}_lstm.h5")
-    model.save(model_path)
-
-    # Store training details in MongoDB
-    model_record = {
-        "stock_symbol": stock_symbol,
-        "trained_on": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "epochs": len(history.history["loss"]),
-        "model_path": model_path,
-        "scaler_min": float(scaler.data_min_[0]),
-        "scaler_max": float(scaler.data_max_[0]),
-    }
-    collection.insert_one(model_record)
-
-    print(f" Model trained and saved: {model_path}")
-    return {"status": "success", "model_path": model_path, "trained_epochs": len(history.history['loss'])}
+    val_loss = _holdout_loss(model, val_data)
+    return _save_model(model, stock_symbol, data, features, scalers, time_steps, horizon,
+                       history, val_loss, "full", val_data)
 
 
 
@@ -0,0 +1,68 @@
+# dataset_builder.py - Sliding-window datasets for the LSTM models
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _as_2d(values) -> np.ndarray:
+    """Treat a 1-D series as a single feature column"""
+    values = np.asarray(values, dtype=np.float32)
+    return values.reshape(-1, 1) if values.ndim == 1 else values
+
+
+def make_windows(values, time_steps: int = 60, horizon: int = 1, target_col: int = 0):
+    """
+    Build training windows as zero-copy strided views
+
+    Args:
+        values: Scaled series, shape (rows,) or (rows, features)
+        time_steps: Length of each input window
+        horizon: Number of future target values per window
+        target_col: Feature column the model predicts
+
+    Returns:
+        (X, y) with X of shape (samples, time_steps, features) and
+        y of shape (samples, horizon); both are views into `values`
+    """
+    values = _as_2d(values)
+    samples = len(values) - time_steps - horizon + 1
+    if samples <= 0:
+        raise ValueError(f"Need more than {time_steps + horizon - 1} rows to build windows, got {len(values)}")
+
+    # (rows - time_steps + 1, features, time_steps) -> (samples, time_steps, features)
+    X = sliding_window_view(values, time_steps, axis=0)[:samples].transpose(0, 2, 1)
+    y = sliding_window_view(values[time_steps:, target_col], horizon)[:samples]
+    return X, y
+
+
+def last_window(values, time_steps: int = 60) -> np.ndarray:
+    """Most recent input window, shaped (1, time_steps, features) for inference"""
+    values = _as_2d(values)
+    if len(values) < time_steps:
+        raise ValueError(f"Need {time_steps} rows for an input window, got {len(values)}")
+    return values[-time_steps:][np.newaxis]
+
+
+def make_tf_dataset(values, time_steps: int = 60, horizon: int = 1, target_col: int = 0,
+                    batch_size: int = 32, shuffle: bool = True, seed: int = None):
+    """
+    Stream windows batch by batch through `tf.data`
+
+    Only one batch is materialised at a time, so memory stays flat for long
+    histories instead of holding every window as a dense array.
+    """
+    import tensorflow as tf
+
+    X, y = make_windows(values, time_steps, horizon, target_col)
+    samples, features = X.shape[0], X.shape[2]
+
+    def generate():
+        order = np.random.default_rng(seed).permutation(samples) if shuffle else np.arange(samples)
+        for start in range(0, samples, batch_size):
+            idx = np.sort(order[start:start + batch_size])
+            yield X[idx], y[idx]
+
+    signature = (
+        tf.TensorSpec(shape=(None, time_steps, features), dtype=tf.float32),
+        tf.TensorSpec(shape=(None, horizon), dtype=tf.float32),
+    )
+    return tf.data.Dataset.from_generator(generate, output_signature=signature).prefetch(tf.data.AUTOTUNE)
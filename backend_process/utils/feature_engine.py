@@ -0,0 +1,247 @@
+# feature_engine.py - Technical-indicator features for the LSTM models
+import re
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Close must stay first: it is the column the models predict
+DEFAULT_FEATURES = ["Close", "Open", "High", "Low", "Volume", "SMA_20", "EMA_20", "RSI_14"]
+RAW_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+_INDICATOR = re.compile(r"^(SMA|EMA|RSI)_(\d+)$")
+
+
+def _parse(feature: str):
+    """Split an indicator name like 'SMA_20' into ('SMA', 20)"""
+    if feature in RAW_COLUMNS:
+        return feature, None
+    match = _INDICATOR.match(feature)
+    if not match:
+        raise ValueError(f"Unknown feature: {feature}")
+    return match.group(1), int(match.group(2))
+
+
+def validate_features(features: List[str]) -> List[str]:
+    """Check feature names and that Close (the target) comes first"""
+    features = list(features)
+    for feature in features:
+        _parse(feature)
+    if not features or features[0] != "Close":
+        raise ValueError("The first feature must be 'Close'")
+    return features
+
+
+def compute_features(frame: pd.DataFrame, features: List[str] = DEFAULT_FEATURES) -> pd.DataFrame:
+    """
+    Compute every requested feature column in one vectorized pass
+
+    SMA is a rolling mean, EMA uses span smoothing and RSI uses Wilder's
+    smoothing; both recursive averages use adjust=False so FeatureState can
+    reproduce them bar by bar. Warm-up rows with missing values are dropped.
+
+    Args:
+        frame: Date-indexed OHLCV frame
+        features: Feature names, e.g. DEFAULT_FEATURES
+
+    Returns:
+        DataFrame with one column per feature, in the requested order
+    """
+    close = frame["Close"].astype("float64")
+    columns = {}
+    for feature in features:
+        kind, period = _parse(feature)
+        if period is None:
+            columns[feature] = frame[feature].astype("float64")
+        elif kind == "SMA":
+            columns[feature] = close.rolling(period).mean()
+        elif kind == "EMA":
+            columns[feature] = close.ewm(span=period, adjust=False).mean()
+        else:
+            delta = close.diff()
+            avg_gain = delta.clip(lower=0).ewm(alpha=1.0 / period, adjust=False).mean()
+            avg_loss = (-delta).clip(lower=0).ewm(alpha=1.0 / period, adjust=False).mean()
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            columns[feature] = rsi.where(avg_loss != 0, 100.0).where(avg_gain.notna())
+    return pd.DataFrame(columns, index=frame.index)[list(features)].dropna()
+
+
+def fit_scalers(feature_frame: pd.DataFrame) -> Dict[str, List[float]]:
+    """Per-feature [min, max] used for 0-1 scaling; stored on the trained_models record"""
+    mins, maxs = feature_frame.min(), feature_frame.max()
+    return {name: [float(mins[name]), float(maxs[name])] for name in feature_frame.columns}
+
+
+def scale_features(values, features: List[str], scalers: Dict[str, List[float]]) -> np.ndarray:
+    """Scale a (rows, features) array or frame with stored min/max, vectorized"""
+    values = np.asarray(values, dtype=np.float64)
+    lo = np.array([scalers[f][0] for f in features])
+    span = np.array([scalers[f][1] - scalers[f][0] for f in features])
+    span[span == 0] = 1.0
+    return ((values - lo) / span).astype(np.float32)
+
+
+class FeatureState:
+    """
+    Running indicator state so one new bar costs O(1) instead of a recompute
+
+    Produces exactly the values compute_features would give for the same
+    history, because both use the same recursive definitions.
+    """
+
+    def __init__(self, features: List[str]):
+        self.features = list(features)
+        self.prev_close = None
+        self.sma = {}   # period -> (deque of closes, running sum)
+        self.ema = {}   # period -> last value
+        self.rsi = {}   # period -> [avg_gain, avg_loss]
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, features: List[str]) -> "FeatureState":
+        """Seed the running state from a full price history"""
+        state = cls(features)
+        close = frame["Close"].astype("float64")
+        delta = close.diff()
+        for feature in features:
+            kind, period = _parse(feature)
+            if kind == "SMA":
+                tail = deque(close.iloc[-period:].tolist(), maxlen=period)
+                state.sma[period] = [tail, float(sum(tail))]
+            elif kind == "EMA":
+                state.ema[period] = float(close.ewm(span=period, adjust=False).mean().iloc[-1])
+            elif kind == "RSI":
+                gain = delta.clip(lower=0).ewm(alpha=1.0 / period, adjust=False).mean().iloc[-1]
+                loss = (-delta).clip(lower=0).ewm(alpha=1.0 / period, adjust=False).mean().iloc[-1]
+                state.rsi[period] = [float(gain), float(loss)]
+        state.prev_close = float(close.iloc[-1])
+        return state
+
+    def copy(self) -> "FeatureState":
+        clone = FeatureState(self.features)
+        clone.prev_close = self.prev_close
+        clone.sma = {p: [deque(v[0], maxlen=p), v[1]] for p, v in self.sma.items()}
+        clone.ema = dict(self.ema)
+        clone.rsi = {p: list(v) for p, v in self.rsi.items()}
+        return clone
+
+    def update(self, bar: Dict[str, float]) -> np.ndarray:
+        """
+        Advance by one bar and return its raw feature row
+
+        Args:
+            bar: Mapping with Open/High/Low/Close/Volume for the new day
+
+        Returns:
+            1-D array of feature values in `self.features` order
+        """
+        close = float(bar["Close"])
+        row = np.empty(len(self.features))
+        for i, feature in enumerate(self.features):
+            kind, period = _parse(feature)
+            if period is None:
+                row[i] = float(bar[feature])
+            elif kind == "SMA":
+                window, total = self.sma[period]
+                if len(window) == period:
+                    total -= window[0]
+                window.append(close)
+                total += close
+                self.sma[period][1] = total
+                row[i] = total / len(window)
+            elif kind == "EMA":
+                alpha = 2.0 / (period + 1)
+                self.ema[period] = alpha * close + (1 - alpha) * self.ema[period]
+                row[i] = self.ema[period]
+            else:
+                alpha = 1.0 / period
+                delta = close - self.prev_close
+                gain, loss = self.rsi[period]
+                gain = alpha * max(delta, 0.0) + (1 - alpha) * gain
+                loss = alpha * max(-delta, 0.0) + (1 - alpha) * loss
+                self.rsi[period] = [gain, loss]
+                row[i] = 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+        self.prev_close = close
+        return row
+
+
+class FeatureCache:
+    """
+    Per-symbol raw feature rows and running state for live inference.
+
+    When the price history grows by one bar since the last call, only that bar
+    is pushed through FeatureState; any other change triggers a full recompute.
+    """
+
+    def __init__(self, max_rows: int = 512):
+        self.max_rows = max_rows
+        self._entries: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def rows(self, symbol: str, recent: pd.DataFrame, features: List[str],
+             load_full: Callable[[], pd.DataFrame]) -> np.ndarray:
+        """
+        Raw feature rows ending at the last bar of `recent`
+
+        Args:
+            symbol: Stock symbol
+            recent: Recent OHLCV frame (its last two bars drive the cache check)
+            features: Feature names the model was trained on
+            load_full: Returns the full stored history, used on a cache miss
+
+        Returns:
+            Array of shape (rows, features), oldest first
+        """
+        key = (symbol, tuple(features))
+        last_date, last_close = recent.index[-1], float(recent["Close"].iloc[-1])
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["last"] == (last_date, last_close):
+                return np.array(entry["rows"])
+            if entry and len(recent) > 1 and entry["last"] == (recent.index[-2], float(recent["Close"].iloc[-2])):
+                bar = recent.iloc[-1]
+                entry["rows"].append(entry["state"].update(bar))
+                entry["last"] = (last_date, last_close)
+                return np.array(entry["rows"])
+
+        # Miss: rebuild from the full history so recursive indicators match training
+        full = load_full()
+        computed = compute_features(full, features)
+        entry = {
+            "state": FeatureState.from_frame(full, features),
+            "rows": deque(computed.to_numpy(), maxlen=self.max_rows),
+            "last": (full.index[-1], float(full["Close"].iloc[-1])),
+        }
+        with self._lock:
+            self._entries[key] = entry
+            return np.array(entry["rows"])
+
+    def roller(self, symbol: str, features: List[str], scalers: Dict[str, List[float]],
+               last_bar: Dict[str, float]) -> Optional[Callable]:
+        """
+        Build a function that turns forecast (scaled) closes into scaled feature rows.
+
+        Used by the forecast loop to extend windows past a model's horizon.
+        """
+        # rows() advances the same state in place, so copy it under the lock
+        with self._lock:
+            entry = self._entries.get((symbol, tuple(features)))
+            if entry is None:
+                return None
+            state = entry["state"].copy()
+        close_min, close_max = scalers["Close"]
+
+        def roll(scaled_closes):
+            rows = []
+            for scaled in np.asarray(scaled_closes).reshape(-1):
+                price = float(scaled) * (close_max - close_min) + close_min
+                bar = {"Open": price, "High": price, "Low": price, "Close": price, "Volume": last_bar["Volume"]}
+                rows.append(state.update(bar))
+            return scale_features(np.array(rows), features, scalers)
+
+        return roll
+
+
+# Create singleton instance
+feature_cache = FeatureCache()
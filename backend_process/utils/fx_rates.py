@@ -0,0 +1,127 @@
+# fx_rates.py - In-memory USD exchange rates with background refresh
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from backend_process.utils.http_client import http_client
+
+# Served until the first successful refresh, and whenever the API is unavailable
+DEFAULT_RATES = {"USD": 1, "EUR": 0.92, "GBP": 0.78, "INR": 84}
+
+
+def fetch_exchange_rates() -> Dict:
+    """
+    Latest USD-based rates from ExchangeRate-API
+
+    Returns:
+        Dictionary with rates, timestamp and source
+    """
+    api_key = os.getenv("EXCHANGE_RATE_API_KEY")
+    if not api_key:
+        raise RuntimeError("EXCHANGE_RATE_API_KEY not found in environment")
+
+    response = http_client.get(f"https://v6.exchangerate-api.com/v6/{api_key}/latest/USD", timeout=10)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
+    data = response.json()
+    if data.get("result") != "success":
+        raise RuntimeError(f"API returned error: {data.get('error-type')}")
+    return {
+        "rates": data.get("conversion_rates", {}),
+        "timestamp": data.get("time_last_update_utc"),
+        "source": "exchangerate-api.com",
+    }
+
+
+class FxRates:
+    """
+    Holds one copy of the exchange rates per process.
+
+    Rates are fetched once on first use and then refreshed by a daemon timer
+    every `refresh_seconds`. A failed refresh keeps serving the previous copy,
+    marked stale. Before any successful fetch, the built-in default rates are
+    used. Callers never wait on the network after the first load.
+    """
+
+    def __init__(self, refresh_seconds: float = 3600.0, fetcher: Callable[[], Dict] = fetch_exchange_rates):
+        self.refresh_seconds = refresh_seconds
+        self.fetcher = fetcher
+        self._snapshot: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._timer_pid = None
+
+    def refresh(self) -> Dict:
+        """Fetch rates now; on failure keep (and flag) the current copy"""
+        try:
+            snapshot = dict(self.fetcher(), stale=False)
+            print("Successfully fetched live exchange rates")
+        except Exception as e:
+            print(f"⚠️ Exchange rate refresh failed: {str(e)}")
+            with self._lock:
+                previous = self._snapshot
+            if previous and previous["source"] != "default":
+                snapshot = dict(previous, stale=True, error=str(e))
+            else:
+                snapshot = {"rates": dict(DEFAULT_RATES), "timestamp": datetime.now().isoformat(),
+                            "source": "default", "stale": True, "error": str(e)}
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self) -> Dict:
+        """Current rates with their timestamp, source and staleness"""
+        if self._snapshot is None or self._timer_pid != os.getpid():
+            self._start()
+        return self._snapshot
+
+    def rates(self) -> Dict[str, float]:
+        return self.snapshot()["rates"]
+
+    def convert(self, amounts, from_currency="USD", to_currency="INR"):
+        """
+        Convert amounts between currencies in one vectorized step
+
+        Args:
+            amounts: A number or array-like of numbers
+            from_currency: Currency code, or array-like of codes (one per amount)
+            to_currency: Currency code, or array-like of codes (one per amount)
+
+        Returns:
+            A float for scalar input, otherwise a NumPy array
+        """
+        rates = self.rates()
+        lookup = lambda codes: np.asarray([rates.get(c, 1) for c in np.atleast_1d(codes)], dtype=np.float64)
+        values = np.asarray(amounts, dtype=np.float64)
+        converted = values / lookup(from_currency) * lookup(to_currency)
+        if values.ndim == 0:
+            return float(converted[0])
+        return converted
+
+    def _start(self):
+        # First caller in a process loads the rates and starts the timer; others wait for it
+        pid = os.getpid()
+        with self._start_lock:
+            if self._timer_pid == pid and self._snapshot is not None:
+                return
+            self._timer_pid = pid
+            self.refresh()
+            self._schedule(pid)
+
+    def _schedule(self, pid: int):
+        timer = threading.Timer(self.refresh_seconds, self._tick, args=(pid,))
+        timer.daemon = True
+        timer.start()
+
+    def _tick(self, pid: int):
+        if self._timer_pid != pid:
+            return
+        self.refresh()
+        self._schedule(pid)
+
+
+# Create singleton instance
+fx_rates = FxRates(refresh_seconds=float(os.getenv("FX_REFRESH_SECONDS", "3600")))
@@ -1,5 +1,5 @@
 import os
-import requests
+from backend_process.utils.http_client import http_client
 from typing import Dict, Any, Optional
 
 class GeminiAI:
@@ -16,9 +16,9 @@ class GeminiAI:
             "generationConfig": {"temperature": 0.7, "maxOutputTokens": 512}
         }
         
-        # Single timeout attempt with optimized settings
+        # Pooled keep-alive session: no new TLS handshake per prompt
         try:
-            response = requests.post(
+            response = http_client.post(
                 f"{self.base_url}/models/{self.model}:generateContent",
                 headers={"Content-Type": "application/json"},
                 json=payload,
@@ -0,0 +1,151 @@
+# http_client.py - Shared keep-alive HTTP sessions for outbound API calls
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HostBusyError(requests.exceptions.ConnectionError):
+    """Raised when a host's concurrency limit stays saturated past the queue timeout"""
+
+
+class JitteredRetry(Retry):
+    """urllib3 Retry whose exponential backoff is spread by +/-50% so clients don't retry in lockstep"""
+
+    def get_backoff_time(self) -> float:
+        return super().get_backoff_time() * random.uniform(0.5, 1.5)
+
+
+class HttpClient:
+    """
+    One pooled `requests.Session` per host, shared by every outbound call.
+
+    Sessions keep connections alive, so repeat calls to the same API skip the
+    TCP and TLS handshake. Failed connects and 429/5xx responses to idempotent
+    requests are retried with jittered exponential backoff. A semaphore per
+    host caps concurrent calls, and every call's latency is recorded per host.
+    Sessions are rebuilt after a fork so workers never share sockets.
+    """
+
+    def __init__(self, pool_size: int = 10, max_per_host: int = 8, retries: int = 2, backoff: float = 0.3,
+                 timeout: float = 10.0, queue_timeout: float = 5.0, slow_ms: float = 1000.0):
+        self.pool_size = pool_size
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.slow_ms = slow_ms
+        self._sessions: Dict[str, requests.Session] = {}
+        self._limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._metrics: Dict[str, Dict] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _session(self, host: str) -> requests.Session:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._sessions.clear()
+                self._limits.clear()
+                self._pid = os.getpid()
+            session = self._sessions.get(host)
+            if session is None:
+                retry = JitteredRetry(
+                    total=self.retries,
+                    backoff_factor=self.backoff,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+                self._limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the host's pooled session
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Passed to `requests.Session.request`; `timeout` defaults to the client's
+
+        Returns:
+            The response (status codes are not raised)
+        """
+        host = urlsplit(url).netloc
+        session = self._session(host)
+        kwargs.setdefault("timeout", self.timeout)
+
+        limit = self._limits[host]
+        if not limit.acquire(timeout=self.queue_timeout):
+            self._record(host, None, error=True)
+            raise HostBusyError(f"Too many concurrent requests to {host}")
+
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(host, (time.perf_counter() - started) * 1000, error=True)
+            raise
+        finally:
+            limit.release()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._record(host, elapsed_ms, error=response.status_code >= 400)
+        if elapsed_ms > self.slow_ms:
+            print(f"🐢 Slow {method} {host}: {elapsed_ms:.0f} ms (status {response.status_code})")
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def _record(self, host: str, elapsed_ms, error: bool):
+        with self._lock:
+            metrics = self._metrics.setdefault(host, {"calls": 0, "errors": 0, "latencies": deque(maxlen=500)})
+            metrics["calls"] += 1
+            metrics["errors"] += int(error)
+            if elapsed_ms is not None:
+                metrics["latencies"].append(elapsed_ms)
+
+    def stats(self) -> Dict:
+        """Per-host call counts, error counts and latency percentiles (ms) over recent calls"""
+        with self._lock:
+            report = {}
+            for host, metrics in self._metrics.items():
+                latencies = sorted(metrics["latencies"])
+                pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 1) if latencies else None
+                report[host] = {
+                    "calls": metrics["calls"],
+                    "errors": metrics["errors"],
+                    "p50_ms": pick(0.5),
+                    "p95_ms": pick(0.95),
+                    "max_ms": round(latencies[-1], 1) if latencies else None,
+                }
+            return report
+
+
+# Create singleton instance
+http_client = HttpClient(
+    pool_size=int(os.getenv("HTTP_POOL_SIZE", "10")),
+    max_per_host=int(os.getenv("HTTP_MAX_PER_HOST", "8")),
+    retries=int(os.getenv("HTTP_RETRIES", "2")),
+    backoff=float(os.getenv("HTTP_BACKOFF_SECONDS", "0.3")),
+    timeout=float(os.getenv("HTTP_TIMEOUT_SECONDS", "10")),
+    queue_timeout=float(os.getenv("HTTP_QUEUE_TIMEOUT_SECONDS", "5")),
+    slow_ms=float(os.getenv("HTTP_SLOW_MS", "1000")),
+)
@@ -0,0 +1,351 @@
+# market_data.py - Market data providers (Yahoo or local files) behind one interface
+import os
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_LOCAL_DIR = os.path.join(BASE_DIR, "data", "fixtures")
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+YAHOO_SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search"
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/116.0.0.0 Safari/537.36"
+}
+
+
+class MarketDataError(Exception):
+    """Upstream market data call failed or timed out"""
+
+
+class CircuitOpenError(MarketDataError):
+    """Upstream is marked degraded; the call was refused without trying"""
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated upstream failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are refused for `reset_seconds`. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.time() - self._opened_at >= self.reset_seconds and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+    def _record(self, ok: bool):
+        with self._lock:
+            self._trial_in_flight = False
+            if ok:
+                if self._opened_at is not None:
+                    print(f"✅ {self.name} circuit closed")
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"⚠️ {self.name} circuit opened after {self._failures} failures")
+                self._opened_at = time.time()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        self._allow()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record(False)
+            raise
+        self._record(True)
+        return result
+
+    def state(self) -> Dict:
+        with self._lock:
+            state = "closed" if self._opened_at is None else "open"
+            return {"name": self.name, "state": state, "consecutive_failures": self._failures}
+
+
+class MarketDataProvider(ABC):
+    """Interface every market data source implements"""
+
+    name = "base"
+
+    @abstractmethod
+    def history(self, symbols: List[str], start, end) -> Dict[str, pd.DataFrame]:
+        """Daily OHLCV bars per symbol, dates in [start, end)"""
+
+    @abstractmethod
+    def quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Latest and previous close per symbol (symbols without data are left out)"""
+
+    @abstractmethod
+    def info(self, symbol: str) -> Optional[Dict]:
+        """Latest price plus company details, or None when the symbol is unknown"""
+
+    @abstractmethod
+    def search(self, query: str) -> List[Dict]:
+        """Symbols matching a company name or ticker fragment"""
+
+
+class YahooMarketData(MarketDataProvider):
+    """
+    Yahoo Finance through yfinance and the public search API.
+
+    Every call runs on a small bounded pool and is abandoned after `timeout`
+    seconds, so a Yahoo slowdown cannot hold request threads hostage. Failures
+    and timeouts feed one circuit breaker; while it is open calls fail at once.
+    """
+
+    name = "yahoo"
+
+    def __init__(self, timeout: float = 8.0, workers: int = 8, breaker: Optional[CircuitBreaker] = None):
+        self.timeout = timeout
+        self.workers = workers
+        self.breaker = breaker or CircuitBreaker("Yahoo Finance")
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _run(self, fn: Callable, *args, timeout: Optional[float] = None):
+        return self._run_all([(fn, args)], timeout=timeout)[0]
+
+    def _run_all(self, calls: List[tuple], timeout: Optional[float] = None) -> List:
+        """Run independent (fn, args) calls concurrently under one deadline; results in order"""
+        with self._lock:
+            if self._executor is None:
+                # Built on the first Yahoo call, after any fork, so each worker process owns its pool
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="market-data")
+        timeout = timeout or self.timeout
+
+        def attempt():
+            futures = [self._executor.submit(fn, *args) for fn, args in calls]
+            _, pending = wait(futures, timeout=timeout)
+            if pending:
+                for future in pending:
+                    future.cancel()
+                names = ", ".join(fn.__name__ for fn, _ in calls)
+                raise MarketDataError(f"{names} timed out after {timeout:g}s")
+            return [future.result() for future in futures]
+
+        return self.breaker.call(attempt)
+
+    @staticmethod
+    def _frame(data: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        if data.empty:
+            return pd.DataFrame(columns=COLUMNS)
+        if data.columns.nlevels > 1:
+            if symbol not in data.columns.get_level_values(0):
+                return pd.DataFrame(columns=COLUMNS)
+            return data[symbol][COLUMNS].dropna(subset=["Close"])
+        return data[COLUMNS].dropna(subset=["Close"])
+
+    def history(self, symbols, start, end):
+        def download(symbols, start, end):
+            import yfinance as yf
+            return yf.download(list(symbols), start=start, end=end, group_by="ticker", progress=False)
+
+        # Long backfills get more time than interactive calls
+        data = self._run(download, symbols, start, end, timeout=self.timeout * 4)
+        return {symbol: self._frame(data, symbol) for symbol in symbols}
+
+    def quotes(self, symbols):
+        def download(symbols):
+            import yfinance as yf
+            return yf.download(list(symbols), period="5d", interval="1d", group_by="ticker",
+                               progress=False, threads=True)
+
+        data = self._run(download, symbols)
+        quotes = {}
+        for symbol in symbols:
+            closes = self._frame(data, symbol)["Close"]
+            if closes.empty:
+                continue
+            quotes[symbol] = {
+                "symbol": symbol,
+                "currentPrice": round(float(closes.iloc[-1]), 2),
+                "previousClose": round(float(closes.iloc[-2]), 2) if len(closes) > 1 else None,
+            }
+        return quotes
+
+    def info(self, symbol):
+        def ticker_info(symbol):
+            import yfinance as yf
+            return yf.Ticker(symbol).info or {}
+
+        def ticker_history(symbol):
+            import yfinance as yf
+            return yf.Ticker(symbol).history(period="1d")
+
+        # Company details and the latest bar are separate Yahoo requests; fetch them side by side
+        info, hist = self._run_all([(ticker_info, (symbol,)), (ticker_history, (symbol,))])
+        if hist.empty and not info.get("currentPrice"):
+            return None
+
+        current_price = float(hist["Close"].iloc[-1]) if not hist.empty else float(info["currentPrice"])
+        return {
+            "symbol": symbol,
+            "currentPrice": round(current_price, 2),
+            "longName": info.get("longName", ""),
+            "exchange": info.get("exchange", ""),
+            "currency": info.get("currency", "USD"),
+            "sector": info.get("sector", ""),
+            "previousClose": info.get("previousClose"),
+            "marketCap": info.get("marketCap"),
+        }
+
+    def search(self, query):
+        def lookup(query):
+            from backend_process.utils.http_client import http_client
+            res = http_client.get(YAHOO_SEARCH_URL, params={"q": query}, headers=BROWSER_HEADERS, timeout=5)
+            res.raise_for_status()
+            return res.json()
+
+        data = self._run(lookup, query, timeout=5)
+        return [
+            {
+                "symbol": r.get("symbol"),
+                "shortname": r.get("shortname"),
+                "exchange": r.get("exchange"),
+                "currency": r.get("currency")
+            }
+            for r in data.get("quotes", [])
+        ]
+
+
+class LocalMarketData(MarketDataProvider):
+    """
+    Deterministic, offline market data for development and load tests.
+
+    Bars come from `{symbol}.csv` files (Date,Open,High,Low,Close,Volume) in
+    `data_dir`. With `synthetic=True` (the default from MARKET_DATA_SYNTHETIC),
+    symbols without a file get a random-walk series seeded by the ticker, so
+    any symbol works and repeat runs see identical data.
+    Company details and search come from the bundled symbol listing.
+    """
+
+    name = "local"
+
+    def __init__(self, data_dir: str = DEFAULT_LOCAL_DIR, synthetic: bool = False):
+        self.data_dir = data_dir
+        self.synthetic = synthetic
+
+    def _bars(self, symbol: str) -> pd.DataFrame:
+        path = os.path.join(self.data_dir, f"{symbol}.csv")
+        if os.path.exists(path):
+            return pd.read_csv(path, index_col="Date", parse_dates=True)[COLUMNS]
+        if not self.synthetic:
+            return pd.DataFrame(columns=COLUMNS)
+
+        # Seeded by the symbol, so every process and every run agrees
+        rng = np.random.default_rng(zlib.crc32(symbol.encode("utf-8")))
+        dates = pd.bdate_range("2020-01-01", pd.Timestamp.today().normalize() - pd.Timedelta(days=1), name="Date")
+        close = (20 + rng.random() * 480) * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(dates))))
+        spread = np.abs(rng.normal(0, 0.01, len(dates))) * close
+        open_ = close * (1 + rng.normal(0, 0.005, len(dates)))
+        return pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 50_000_000, len(dates)).astype(float),
+        }, index=dates)
+
+    def history(self, symbols, start, end):
+        frames = {}
+        for symbol in symbols:
+            bars = self._bars(symbol)
+            frames[symbol] = bars.loc[pd.Timestamp(start):pd.Timestamp(end) - pd.Timedelta(days=1)]
+        return frames
+
+    def quotes(self, symbols):
+        quotes = {}
+        for symbol in symbols:
+            closes = self._bars(symbol)["Close"].dropna()
+            if closes.empty:
+                continue
+            quotes[symbol] = {
+                "symbol": symbol,
+                "currentPrice": round(float(closes.iloc[-1]), 2),
+                "previousClose": round(float(closes.iloc[-2]), 2) if len(closes) > 1 else None,
+            }
+        return quotes
+
+    def info(self, symbol):
+        from backend_process.utils.symbol_index import symbol_index
+
+        quote = self.quotes([symbol]).get(symbol)
+        if quote is None:
+            return None
+        listing = symbol_index.get(symbol) or {}
+        return dict(quote, longName=listing.get("shortname", ""), exchange=listing.get("exchange", ""),
+                    currency=listing.get("currency") or "USD", sector="", marketCap=None)
+
+    def search(self, query):
+        from backend_process.utils.symbol_index import symbol_index
+        return symbol_index.search(query)
+
+
+_provider: Optional[MarketDataProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_market_data() -> MarketDataProvider:
+    """
+    The process-wide provider, chosen by MARKET_DATA_PROVIDER (yahoo | local)
+
+    PRICE_PROVIDER=fixture is still accepted as an alias for local.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                kind = os.getenv("MARKET_DATA_PROVIDER", "").lower()
+                if not kind:
+                    kind = "local" if os.getenv("PRICE_PROVIDER", "").lower() == "fixture" else "yahoo"
+                if kind == "local":
+                    _provider = LocalMarketData(
+                        data_dir=os.getenv("MARKET_DATA_DIR", os.getenv("PRICE_FIXTURE_DIR", DEFAULT_LOCAL_DIR)),
+                        synthetic=os.getenv("MARKET_DATA_SYNTHETIC", "true").lower() == "true",
+                    )
+                else:
+                    _provider = YahooMarketData(
+                        timeout=float(os.getenv("MARKET_DATA_TIMEOUT_SECONDS", "8")),
+                        workers=int(os.getenv("MARKET_DATA_WORKERS", "8")),
+                        breaker=CircuitBreaker(
+                            "Yahoo Finance",
+                            failure_threshold=int(os.getenv("MARKET_DATA_FAILURE_THRESHOLD", "5")),
+                            reset_seconds=float(os.getenv("MARKET_DATA_RESET_SECONDS", "30")),
+                        ),
+                    )
+                print(f"📈 Market data provider: {_provider.name}")
+    return _provider
+
+
+def set_market_data(provider: MarketDataProvider):
+    """Swap the process-wide provider (e.g. for load tests)"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,201 @@
+# model_artifacts.py - Compact, memory-mappable quantized model files
+import json
+import os
+import struct
+from typing import Dict, Optional
+
+import numpy as np
+
+from backend_process.utils.numpy_lstm import NumpyLSTMModel
+
+MAGIC = b"PLSTMQ01"
+ALIGN = 64
+ARTIFACT_SUFFIX = ".lstmq"
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+
+def _quantize(array: np.ndarray, dtype: str):
+    """Return (stored array, per-column scale or None)"""
+    if dtype == "float32":
+        return array.astype(np.float32), None
+    if dtype == "float16":
+        return array.astype(np.float16), None
+    # Symmetric int8 with one scale per output column
+    scale = np.max(np.abs(array), axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    return np.clip(np.round(array / scale), -127, 127).astype(np.int8), scale.astype(np.float32)
+
+
+def export_artifact(model: NumpyLSTMModel, path: str, dtype: str = "float16") -> str:
+    """
+    Write a model as one flat file: magic, JSON header, then aligned raw tensors
+
+    Kernels are stored as float16 or int8 (per-column scales); biases and scales
+    stay float32. The layout lets `load_artifact` map the file read-only so all
+    worker processes share its pages through the OS page cache.
+
+    Args:
+        model: Single (unstacked) NumPy model
+        path: Destination file, conventionally ending in .lstmq
+        dtype: One of float32, float16, int8
+
+    Returns:
+        The path written
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported artifact dtype: {dtype}")
+
+    tensors, layers = [], []
+    for i, layer in enumerate(model.layers):
+        layers.append({k: layer[k] for k in ("kind", "activation", "recurrent_activation", "return_sequences")
+                       if k in layer})
+        for name in ("kernel", "recurrent_kernel", "bias"):
+            if name not in layer:
+                continue
+            array = layer[name][0]
+            stored, scale = _quantize(array, dtype) if name != "bias" else (array.astype(np.float32), None)
+            tensors.append((f"{i}/{name}", stored))
+            if scale is not None:
+                tensors.append((f"{i}/{name}/scale", scale))
+
+    # Lay tensors out back to back, each aligned for direct mapping
+    table, offset = [], 0
+    for name, array in tensors:
+        offset = -(-offset // ALIGN) * ALIGN
+        table.append({"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "offset": offset})
+        offset += array.nbytes
+
+    header = json.dumps({"dtype": dtype, "layers": layers, "tensors": table}).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 4 + len(header)) // ALIGN) * ALIGN
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for entry, (_, array) in zip(table, tensors):
+            f.seek(data_start + entry["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+class MappedLSTMModel(NumpyLSTMModel):
+    """
+    NumPy LSTM whose weights stay in a read-only memory map.
+
+    Quantized kernels are widened to float32 only for the duration of a forward
+    pass, into temporaries that are freed when it returns. What stays resident
+    is the compact file, whose pages every worker process shares.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a model artifact: {path}")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len))
+        data_start = -(-(len(MAGIC) + 4 + header_len) // ALIGN) * ALIGN
+
+        self.path = path
+        self.dtype = header["dtype"]
+        self._map = np.memmap(path, mode="r")
+        self._tensors = {
+            t["name"]: np.ndarray(tuple(t["shape"]), dtype=np.dtype(t["dtype"]), buffer=self._map,
+                                  offset=data_start + t["offset"])
+            for t in header["tensors"]
+        }
+        self._configs = header["layers"]
+        # No float32 `layers` are stored; see the property below
+
+    def _weight(self, name: str) -> np.ndarray:
+        stored = self._tensors[name]
+        scale = self._tensors.get(f"{name}/scale")
+        weight = stored.astype(np.float32)
+        if scale is not None:
+            weight *= scale
+        return weight[np.newaxis]
+
+    def _materialize(self):
+        layers = []
+        for i, cfg in enumerate(self._configs):
+            layer = dict(cfg)
+            for name in ("kernel", "recurrent_kernel", "bias"):
+                if f"{i}/{name}" in self._tensors:
+                    layer[name] = self._weight(f"{i}/{name}")
+            layers.append(layer)
+        return layers
+
+    @property
+    def layers(self):
+        """A float32 copy of the weights, built on each access (e.g. for `stack`)"""
+        return self._materialize()
+
+    def predict(self, X) -> np.ndarray:
+        return self._forward(X, self._materialize())
+
+    def signature(self) -> tuple:
+        # From the mapped tensor shapes, without widening anything
+        return tuple((cfg["kind"], self._tensors[f"{i}/kernel"].shape, cfg.get("return_sequences"))
+                     for i, cfg in enumerate(self._configs))
+
+    def resident_bytes(self) -> int:
+        # Shared page-cache pages of the mapped file; forward-pass temporaries are not kept
+        return int(self._map.nbytes)
+
+
+def load_artifact(path: str) -> MappedLSTMModel:
+    """Map an exported artifact for inference"""
+    return MappedLSTMModel(path)
+
+
+def artifact_path_for(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ARTIFACT_SUFFIX
+
+
+def accuracy_report(reference: NumpyLSTMModel, quantized: NumpyLSTMModel, X, y=None,
+                    price_scale: Optional[float] = None) -> Dict:
+    """
+    Compare a quantized model with its float32 reference on the same inputs
+
+    Args:
+        reference: Float32 model
+        quantized: Model loaded from the artifact
+        X: Input windows, (samples, time_steps, features)
+        y: Optional targets, to report the change in MSE
+        price_scale: Optional scaler span (max - min) to express errors in price units
+
+    Returns:
+        Dictionary of output and loss deltas
+    """
+    expected = reference.predict(X)
+    actual = quantized.predict(X)
+    diff = np.abs(expected - actual)
+    report = {"max_abs_diff": float(diff.max()), "mean_abs_diff": float(diff.mean())}
+    if y is not None:
+        y = np.asarray(y, dtype=np.float32).reshape(expected.shape)
+        report["mse_float32"] = float(np.mean((expected - y) ** 2))
+        report["mse_quantized"] = float(np.mean((actual - y) ** 2))
+        report["mse_delta"] = report["mse_quantized"] - report["mse_float32"]
+    if price_scale is not None:
+        report["max_abs_diff_price"] = report["max_abs_diff"] * float(price_scale)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from backend_process.utils.numpy_lstm import load_model
+
+    parser = argparse.ArgumentParser(description="Export .h5 models as quantized .lstmq artifacts")
+    parser.add_argument("models", nargs="+", help="Keras .h5 model files")
+    parser.add_argument("--dtype", default="float16", choices=SUPPORTED_DTYPES)
+    args = parser.parse_args()
+
+    for model_path in args.models:
+        reference = load_model(model_path)
+        out_path = export_artifact(reference, artifact_path_for(model_path), args.dtype)
+        features = reference.layers[0]["kernel"].shape[1]
+        probe = np.random.default_rng(0).random((64, 60, features), dtype=np.float32)
+        report = accuracy_report(reference, load_artifact(out_path), probe)
+        report.update({"artifact": out_path, "bytes": os.path.getsize(out_path), "h5_bytes": os.path.getsize(model_path)})
+        print(json.dumps(report, indent=4))
@@ -0,0 +1,132 @@
+# model_cache.py - In-process LRU registry of loaded prediction models
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def _default_loader(model_path: str):
+    # NumPy engine by default; INFERENCE_ENGINE=keras loads the model through TensorFlow
+    if os.getenv("INFERENCE_ENGINE", "numpy").lower() == "keras":
+        from tensorflow.keras.models import load_model
+        return load_model(model_path, compile=False)
+
+    from backend_process.utils.numpy_lstm import load_model
+    return load_model(model_path)
+
+
+def _resident_bytes(model, model_path: str) -> int:
+    """Memory a loaded model keeps, which is what the byte budget bounds (not the file size)"""
+    if hasattr(model, "resident_bytes"):
+        return model.resident_bytes()
+    if hasattr(model, "count_params"):
+        # Keras: float32 weights; graph and optimizer overhead are not counted
+        return int(model.count_params()) * 4
+    return os.path.getsize(model_path)
+
+
+class ModelCache:
+    """
+    Keeps loaded models resident between requests.
+
+    Entries are keyed by model path and evicted least-recently-used once either
+    the entry budget or the memory budget is exceeded. Each entry is charged
+    what the loaded model keeps in memory. An entry is
+    invalidated when the file's mtime changes or when the `trained_models`
+    record that points at it changes (new `_id` / `trained_on`).
+    """
+
+    def __init__(self, max_entries: int = 16, max_bytes: int = 512 * 1024 * 1024,
+                 loader: Callable[[str], Any] = _default_loader):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _record_tag(record: Optional[Dict]) -> Optional[str]:
+        """Identify the training run a record describes"""
+        if not record:
+            return None
+        return f"{record.get('_id')}|{record.get('trained_on')}"
+
+    def get(self, model_path: str, record: Optional[Dict] = None):
+        """
+        Return the model stored at `model_path`, loading it on a miss
+
+        Args:
+            model_path: Path to the saved model file
+            record: The `trained_models` document the path came from
+
+        Returns:
+            Loaded model object
+        """
+        mtime = os.path.getmtime(model_path)
+        tag = self._record_tag(record)
+
+        with self._lock:
+            entry = self._entries.get(model_path)
+            if entry and entry["mtime"] == mtime and entry["tag"] == tag:
+                self._entries.move_to_end(model_path)
+                self.hits += 1
+                return entry["model"]
+            if entry:
+                self._drop(model_path)
+            self.misses += 1
+
+        # Load outside the lock so one slow load does not block cache hits
+        model = self.loader(model_path)
+        size = _resident_bytes(model, model_path)
+
+        with self._lock:
+            if model_path in self._entries:
+                self._drop(model_path)
+            self._entries[model_path] = {"model": model, "mtime": mtime, "tag": tag, "size": size}
+            self._total_bytes += size
+            self._evict()
+        return model
+
+    def invalidate(self, model_path: Optional[str] = None):
+        """Drop one cached model, or all of them when no path is given"""
+        with self._lock:
+            if model_path is None:
+                self._entries.clear()
+                self._total_bytes = 0
+            elif model_path in self._entries:
+                self._drop(model_path)
+
+    def stats(self) -> Dict:
+        """Return cache occupancy and hit counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _drop(self, model_path: str):
+        entry = self._entries.pop(model_path)
+        self._total_bytes -= entry["size"]
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds the byte budget
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            print(f"♻️ Evicted model from cache: {oldest}")
+
+
+# Create singleton instance
+model_cache = ModelCache(
+    max_entries=int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "16")),
+    max_bytes=int(float(os.getenv("MODEL_CACHE_MAX_MB", "512")) * 1024 * 1024),
+)
@@ -0,0 +1,235 @@
+# model_registry.py - Versioned model records with a promoted "current" pointer per symbol
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from db_connection.db import get_collection
+
+MODEL_ROOT = os.getenv("MODEL_DIR", "models")
+
+# Promotions committed slightly out of order are still picked up by the next poll
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class ModelRegistry:
+    """
+    Tracks every trained model version and which one each symbol serves.
+
+    Each training run gets the next version number and its own directory
+    (models/{SYMBOL}/v{N}/), so files are never overwritten and a record's
+    scalers always describe the weights beside it. `promote` swaps the symbol's
+    pointer document in one atomic update.
+
+    Serving reads `current()`, which is answered from an in-process copy of all
+    promoted records. A daemon thread polls for newer promotions, so the request
+    path does no Mongo round trip once the copy is warm. Symbols without a
+    promoted model (unknown ones, and legacy records found by the newest-record
+    fallback) are cached for `unpromoted_ttl` seconds only, because no promotion
+    will ever refresh them.
+    """
+
+    def __init__(self, refresh_seconds: float = 30.0, unpromoted_ttl: float = 300.0):
+        self.records = get_collection(os.getenv("MODEL_COLLECTION", "trained_models"))
+        self.pointers = get_collection("model_pointers")
+        self.counters = get_collection("counters")
+        self.refresh_seconds = refresh_seconds
+        self.unpromoted_ttl = unpromoted_ttl
+        self._current: Dict[str, Optional[Dict]] = {}
+        self._expires: Dict[str, float] = {}  # symbol -> monotonic expiry, for entries no pointer backs
+        self._watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._loaded_pid = None
+
+    # ----- training side -----
+
+    def next_version(self, symbol: str) -> int:
+        """Allocate the next version number for a symbol"""
+        counter = self.counters.find_one_and_update(
+            {"_id": f"model_version:{symbol.upper()}"},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=True
+        )
+        return int(counter["seq"])
+
+    @staticmethod
+    def version_dir(symbol: str, version: int) -> str:
+        """Directory that holds one version's files; created empty, never reused"""
+        path = os.path.join(MODEL_ROOT, symbol.upper(), f"v{version}")
+        os.makedirs(path, exist_ok=False)
+        return path
+
+    def register(self, record: Dict) -> Dict:
+        """Store a version's record; it is not served until promoted"""
+        if "version" not in record:
+            raise ValueError("Model record needs a version")
+        result = self.records.insert_one(record)
+        record["_id"] = result.inserted_id
+        return record
+
+    def promote(self, symbol: str, version: int) -> Dict:
+        """
+        Point `symbol` at `version` (also used to roll back)
+
+        Returns:
+            Dictionary with result status and the promoted record
+        """
+        symbol = symbol.upper()
+        record = self.records.find_one({"stock_symbol": symbol, "version": int(version)})
+        if not record:
+            return {"success": False, "error": f"No version {version} registered for {symbol}"}
+
+        self.pointers.update_one(
+            {"_id": symbol},
+            {"$set": {"version": int(version), "record_id": record["_id"]},
+             "$currentDate": {"promoted_at": True}},
+            upsert=True
+        )
+        # This process sees its own promotion immediately; others on their next poll
+        with self._lock:
+            self._current[symbol] = record
+            self._expires.pop(symbol, None)
+        print(f"✅ Promoted {symbol} model v{version}")
+        return {"success": True, "data": record}
+
+    # ----- serving side -----
+
+    def current(self, symbol: str) -> Optional[Dict]:
+        """Record of the promoted model for a symbol, from the in-process copy"""
+        return self.current_many([symbol]).get(symbol.upper())
+
+    def current_many(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """Promoted records for many symbols; unknown symbols are looked up once per `unpromoted_ttl`"""
+        self._ensure_loaded()
+        symbols = [s.upper() for s in symbols]
+        now = time.monotonic()
+        with self._lock:
+            missing = [s for s in symbols if s not in self._current or self._expires.get(s, now + 1) <= now]
+        if missing:
+            found, promoted = self._fetch_records(missing)
+            with self._lock:
+                for symbol in missing:
+                    if symbol in self._current and symbol not in self._expires:
+                        continue  # a promotion landed while we were fetching
+                    self._current[symbol] = found.get(symbol)
+                    if symbol in promoted:
+                        self._expires.pop(symbol, None)
+                    else:
+                        self._expires[symbol] = now + self.unpromoted_ttl
+        with self._lock:
+            return {s: self._current[s] for s in symbols if self._current.get(s)}
+
+    def lookup(self, symbol: str) -> Optional[Dict]:
+        """Promoted record read straight from Mongo (for training and scripts)"""
+        return self._fetch([symbol.upper()]).get(symbol.upper())
+
+    def versions(self, symbol: str) -> List[Dict]:
+        """Every registered version of a symbol, newest first"""
+        return list(self.records.find({"stock_symbol": symbol.upper()}, {"feature_scalers": 0})
+                    .sort("version", -1))
+
+    def refresh(self) -> int:
+        """
+        Pull promotions newer than the last one seen
+
+        Returns:
+            Number of symbols updated
+        """
+        query = {"promoted_at": {"$gte": self._watermark - _REFRESH_OVERLAP}} if self._watermark else {}
+        pointers = list(self.pointers.find(query))
+        if not pointers:
+            return 0
+
+        ids = [p["record_id"] for p in pointers]
+        records = {r["_id"]: r for r in self.records.find({"_id": {"$in": ids}})}
+        with self._lock:
+            for pointer in pointers:
+                if pointer["record_id"] in records:
+                    self._current[pointer["_id"]] = records[pointer["record_id"]]
+                    self._expires.pop(pointer["_id"], None)
+            self._watermark = max(p["promoted_at"] for p in pointers)
+        return len(pointers)
+
+    def invalidate(self):
+        """Forget the in-process copy; the next call reloads it"""
+        with self._lock:
+            self._current.clear()
+            self._expires.clear()
+            self._watermark = None
+            self._loaded_pid = None
+
+    def _fetch(self, symbols: List[str]) -> Dict[str, Dict]:
+        return self._fetch_records(symbols)[0]
+
+    def _fetch_records(self, symbols: List[str]) -> Tuple[Dict[str, Dict], Set[str]]:
+        """Records per symbol, and the symbols whose record came through a promotion pointer"""
+        pointers = {p["_id"]: p["record_id"] for p in self.pointers.find({"_id": {"$in": symbols}})}
+        found = {}
+        if pointers:
+            for record in self.records.find({"_id": {"$in": list(pointers.values())}}):
+                found[record["stock_symbol"]] = record
+        # Symbols trained before versioning have no pointer: serve their newest record
+        legacy = [s for s in symbols if s not in pointers]
+        if legacy:
+            for record in self.records.find({"stock_symbol": {"$in": legacy}}).sort("trained_on", -1):
+                found.setdefault(record["stock_symbol"], record)
+        return found, {s for s in pointers if s in found}
+
+    def _ensure_loaded(self):
+        # One full load per process, then a background poller (restarted after fork)
+        pid = os.getpid()
+        if self._loaded_pid == pid:
+            return
+        with self._lock:
+            if self._loaded_pid == pid:
+                return
+            self._loaded_pid = pid
+            self._watermark = None
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️ Could not load model registry: {str(e)}")
+        threading.Thread(target=self._poll, args=(pid,), daemon=True, name="model-registry").start()
+
+    def _poll(self, pid: int):
+        while self._loaded_pid == pid:
+            time.sleep(self.refresh_seconds)
+            try:
+                updated = self.refresh()
+                if updated:
+                    print(f"🔄 Model registry refreshed ({updated} promotions)")
+            except Exception as e:
+                print(f"⚠️ Model registry refresh failed: {str(e)}")
+
+
+# Create singleton instance
+model_registry = ModelRegistry(
+    refresh_seconds=float(os.getenv("MODEL_REGISTRY_REFRESH_SECONDS", "30")),
+    unpromoted_ttl=float(os.getenv("MODEL_REGISTRY_UNPROMOTED_TTL_SECONDS", "300")),
+)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="List or promote model versions")
+    parser.add_argument("command", choices=["list", "promote"])
+    parser.add_argument("symbol")
+    parser.add_argument("version", nargs="?", type=int)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        current = model_registry.lookup(args.symbol) or {}
+        for record in model_registry.versions(args.symbol):
+            marker = "*" if record["_id"] == current.get("_id") else " "
+            print(f"{marker} v{record['version']}  {record['trained_on']}  {record.get('mode', '')}  "
+                  f"val_loss={record.get('val_loss')}  {record['model_path']}")
+    else:
+        if args.version is None:
+            parser.error("promote needs a version")
+        result = model_registry.promote(args.symbol, args.version)
+        print(json.dumps({k: v for k, v in result.items() if k != "data"}, indent=4))
@@ -0,0 +1,209 @@
+# numpy_lstm.py - TensorFlow-free inference for the saved LSTM models
+import json
+from typing import Dict, List
+
+import numpy as np
+
+_ACTIVATIONS = {
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+    "relu": lambda x: np.maximum(x, 0.0),
+    "linear": lambda x: x,
+}
+
+
+def _activation(name: str):
+    if name not in _ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return _ACTIVATIONS[name]
+
+
+def _as_str(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+class NumpyLSTMModel:
+    """
+    Forward pass of a Keras Sequential LSTM/Dense stack using NumPy matmuls.
+
+    Every weight carries a leading model axis of size M. A plain model has M = 1
+    and broadcasts over any batch; `stack` combines same-shaped models so each
+    batch row runs through its own weights in the same matmuls (M = batch).
+    Dropout layers are inference no-ops and are not stored.
+    """
+
+    def __init__(self, layers: List[Dict]):
+        self.layers = layers
+
+    # ----- loading -----
+
+    @classmethod
+    def from_h5(cls, path: str) -> "NumpyLSTMModel":
+        """Read layer config and weights from a Keras .h5 file with h5py only"""
+        import h5py
+
+        with h5py.File(path, "r") as f:
+            config = json.loads(_as_str(f.attrs["model_config"]))
+            layer_configs = config["config"]
+            if isinstance(layer_configs, dict):
+                layer_configs = layer_configs["layers"]
+            weights_root = f["model_weights"] if "model_weights" in f else f
+
+            layers = []
+            for layer in layer_configs:
+                kind, cfg = layer["class_name"], layer["config"]
+                if kind not in ("LSTM", "Dense"):
+                    continue
+                group = weights_root[cfg["name"]]
+                arrays = {}
+                for weight_name in group.attrs["weight_names"]:
+                    weight_name = _as_str(weight_name)
+                    short = weight_name.split("/")[-1].split(":")[0]
+                    arrays[short] = np.asarray(group[weight_name], dtype=np.float32)
+                layers.append(cls._layer(kind, cfg, arrays))
+        return cls(layers)
+
+    @classmethod
+    def from_npz(cls, path: str) -> "NumpyLSTMModel":
+        """Read a file written by `save_npz`"""
+        with np.load(path, allow_pickle=False) as data:
+            config = json.loads(str(data["config"]))
+            layers = []
+            for i, cfg in enumerate(config):
+                arrays = {name: data[f"{i}/{name}"] for name in ("kernel", "recurrent_kernel", "bias")
+                          if f"{i}/{name}" in data}
+                layers.append(cls._layer(cfg["kind"], cfg, arrays))
+        return cls(layers)
+
+    @staticmethod
+    def _layer(kind: str, cfg: Dict, arrays: Dict[str, np.ndarray]) -> Dict:
+        layer = {
+            "kind": kind,
+            "activation": cfg.get("activation", "tanh" if kind == "LSTM" else "linear"),
+            "kernel": arrays["kernel"][np.newaxis],
+            "bias": arrays.get("bias", np.zeros(arrays["kernel"].shape[-1], dtype=np.float32))[np.newaxis],
+        }
+        if kind == "LSTM":
+            layer["recurrent_activation"] = cfg.get("recurrent_activation", "sigmoid")
+            layer["return_sequences"] = bool(cfg.get("return_sequences", False))
+            layer["recurrent_kernel"] = arrays["recurrent_kernel"][np.newaxis]
+        return layer
+
+    def save_npz(self, path: str):
+        """Write config and float32 weights as one compact .npz file"""
+        config, arrays = [], {}
+        for i, layer in enumerate(self.layers):
+            if layer["kernel"].shape[0] != 1:
+                raise ValueError("Only single (unstacked) models can be saved")
+            config.append({k: layer[k] for k in ("kind", "activation", "recurrent_activation", "return_sequences")
+                           if k in layer})
+            for name in ("kernel", "recurrent_kernel", "bias"):
+                if name in layer:
+                    arrays[f"{i}/{name}"] = layer[name][0]
+        np.savez(path, config=json.dumps(config), **arrays)
+
+    @classmethod
+    def stack(cls, models: List["NumpyLSTMModel"]) -> "NumpyLSTMModel":
+        """Combine same-architecture models; row i of the input uses models[i]"""
+        layers = []
+        for parts in zip(*(m.layers for m in models)):
+            layer = dict(parts[0])
+            for name in ("kernel", "recurrent_kernel", "bias"):
+                if name in layer:
+                    layer[name] = np.concatenate([p[name] for p in parts])
+            layers.append(layer)
+        return cls(layers)
+
+    # ----- inference -----
+
+    @staticmethod
+    def _lstm(x: np.ndarray, layer: Dict) -> np.ndarray:
+        act = _activation(layer["activation"])
+        rec_act = _activation(layer["recurrent_activation"])
+        W, U, b = layer["kernel"], layer["recurrent_kernel"], layer["bias"]
+        units = U.shape[1]
+        batch, steps, _ = x.shape
+
+        # Input projections for every timestep in one matmul: (batch, steps, 4*units)
+        xw = np.matmul(x, W) + b[:, np.newaxis, :]
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, steps, units), dtype=np.float32) if layer["return_sequences"] else None
+
+        for t in range(steps):
+            z = xw[:, t] + np.matmul(h[:, np.newaxis, :], U)[:, 0]
+            # Keras gate order: input, forget, cell candidate, output
+            i = rec_act(z[:, :units])
+            f = rec_act(z[:, units:2 * units])
+            g = act(z[:, 2 * units:3 * units])
+            o = rec_act(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * act(c)
+            if outputs is not None:
+                outputs[:, t] = h
+        return outputs if outputs is not None else h
+
+    def predict(self, X) -> np.ndarray:
+        """Run the network on a (batch, time_steps, features) array"""
+        return self._forward(X, self.layers)
+
+    def _forward(self, X, layers: List[Dict]) -> np.ndarray:
+        x = np.asarray(X, dtype=np.float32)
+        for layer in layers:
+            if layer["kind"] == "LSTM":
+                x = self._lstm(x, layer)
+            else:
+                x = np.matmul(x[:, np.newaxis, :], layer["kernel"])[:, 0] + layer["bias"]
+                x = _activation(layer["activation"])(x)
+        return x
+
+    def __call__(self, X, training=False):
+        # Same call signature as a Keras model so callers can use either engine
+        return self.predict(X)
+
+    def resident_bytes(self) -> int:
+        """Memory held by the weights"""
+        return sum(layer[name].nbytes for layer in self.layers
+                   for name in ("kernel", "recurrent_kernel", "bias") if name in layer)
+
+    def signature(self) -> tuple:
+        """Shape key: models with equal signatures can be stacked"""
+        return tuple((l["kind"], l["kernel"].shape[1:], l.get("return_sequences")) for l in self.layers)
+
+
+def load_model(path: str) -> NumpyLSTMModel:
+    """Load a model from a Keras .h5 file, an exported .npz, or a mapped .lstmq artifact"""
+    if path.endswith(".lstmq"):
+        from backend_process.utils.model_artifacts import load_artifact
+        return load_artifact(path)
+    if path.endswith(".npz"):
+        return NumpyLSTMModel.from_npz(path)
+    return NumpyLSTMModel.from_h5(path)
+
+
+def verify_against_keras(model_path: str, samples: int = 16, atol: float = 1e-4, seed: int = 0) -> Dict:
+    """
+    Compare this engine with Keras on random inputs (needs TensorFlow)
+
+    Returns:
+        Dictionary with the max absolute difference and whether it is within `atol`
+    """
+    from tensorflow.keras.models import load_model as keras_load_model
+
+    keras_model = keras_load_model(model_path, compile=False)
+    numpy_model = load_model(model_path)
+    _, time_steps, features = keras_model.input_shape
+    X = np.random.default_rng(seed).random((samples, time_steps, features), dtype=np.float32)
+
+    expected = np.asarray(keras_model(X, training=False))
+    actual = numpy_model.predict(X)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    return {"model_path": model_path, "max_abs_diff": max_diff, "atol": atol, "ok": max_diff <= atol}
+
+
+if __name__ == "__main__":
+    import sys
+
+    for model_path in sys.argv[1:]:
+        print(json.dumps(verify_against_keras(model_path), indent=4))
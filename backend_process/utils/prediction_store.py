@@ -0,0 +1,99 @@
+# prediction_store.py - Materialized forecasts in the `predictions` collection
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from db_connection.db import get_collection
+
+# Local hour after which today's bar is considered final
+MARKET_CLOSE_HOUR = int(os.getenv("MARKET_CLOSE_HOUR", "16"))
+
+
+def trading_date(now: Optional[datetime] = None) -> str:
+    """
+    The trading date forecasts are keyed on: the latest weekday whose bar is complete
+    """
+    now = now or datetime.now()
+    day = now.date()
+    if now.hour < MARKET_CLOSE_HOUR:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:  # Saturday / Sunday
+        day -= timedelta(days=1)
+    return day.strftime("%Y-%m-%d")
+
+
+def model_id(record: Optional[Dict]) -> Optional[str]:
+    """Identifier of the model record a forecast was produced by"""
+    return str(record["_id"]) if record and record.get("_id") is not None else None
+
+
+class PredictionStore:
+    """
+    Helper class for reading and writing precomputed forecasts
+
+    Each forecast records the `model_id` that produced it, and reads ask for the
+    currently promoted model's id. After a retrain or promotion the stored row
+    no longer matches, so it is recomputed instead of served for the rest of the day.
+    """
+
+    def __init__(self):
+        self.collection = get_collection('predictions')
+
+    def get(self, symbol: str, horizon: int, model: Optional[str], as_of: Optional[str] = None) -> Optional[Dict]:
+        """
+        Fetch the forecast for (symbol, as-of date, horizon) made by `model` in one indexed lookup
+
+        Args:
+            symbol: Stock symbol
+            horizon: Days forecast
+            model: model_id of the promoted model; None always misses
+
+        Returns:
+            Prediction document or None on a miss
+        """
+        if not model:
+            return None
+        try:
+            return self.collection.find_one(
+                {"symbol": symbol.upper(), "as_of": as_of or trading_date(), "horizon": int(horizon),
+                 "model_id": model},
+                {"_id": 0}
+            )
+        except Exception as e:
+            print(f"❌ Error reading materialized prediction: {str(e)}")
+            return None
+
+    def put(self, symbol: str, horizon: int, predictions: List[Dict], model: str, as_of: Optional[str] = None):
+        """Store (or replace) one forecast made by `model`"""
+        try:
+            key = {"symbol": symbol.upper(), "as_of": as_of or trading_date(), "horizon": int(horizon)}
+            self.collection.update_one(
+                key,
+                {"$set": {**key, "model_id": model, "predictions": predictions, "created_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"❌ Error writing materialized prediction: {str(e)}")
+
+    def put_many(self, docs: List[Dict]) -> int:
+        """Upsert many {symbol, horizon, model_id, predictions} documents in one bulk write"""
+        from pymongo import UpdateOne
+
+        as_of = trading_date()
+        now = datetime.utcnow()
+        operations = []
+        for doc in docs:
+            key = {"symbol": doc["symbol"].upper(), "as_of": doc.get("as_of", as_of), "horizon": int(doc["horizon"])}
+            operations.append(UpdateOne(
+                key, {"$set": {**key, "model_id": doc["model_id"], "predictions": doc["predictions"], "created_at": now}},
+                upsert=True
+            ))
+        if not operations:
+            return 0
+        result = self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+
+# Create singleton instance
+prediction_store = PredictionStore()
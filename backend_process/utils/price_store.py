@@ -0,0 +1,211 @@
+# price_store.py - Local per-symbol OHLCV store with incremental append
+import os
+import threading
+import time
+from datetime import datetime, timedelta, date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend_process.utils.market_data import COLUMNS, MarketDataProvider, get_market_data
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_DATA_DIR = os.path.join(BASE_DIR, "data", "prices")
+DEFAULT_START = "2020-01-01"
+
+# On-disk row layout: one fixed-width record per trading day
+BAR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("Open", "f8"),
+    ("High", "f8"),
+    ("Low", "f8"),
+    ("Close", "f8"),
+    ("Volume", "f8"),
+])
+
+
+class PriceStore:
+    """
+    Per-symbol daily OHLCV history kept as `.npy` files under a data directory.
+
+    Files are read memory-mapped. A refresh downloads only the bars from the last
+    stored date onward (the last bar is re-fetched in case it was partial) and
+    rewrites the file atomically. Symbols that share a start date go in one
+    batched request, so one new symbol does not pull full history for the rest.
+    Each symbol is checked upstream at most once per `ttl_seconds` per process,
+    so repeat reads never touch the network and today's partial bar is still
+    updated during the day. A failed check is retried only after `retry_seconds`.
+
+    The download runs without holding the store lock. A symbol being refreshed
+    is owned by the thread that claimed it; other callers wait for that refresh
+    instead of starting a second download.
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, provider: Optional[MarketDataProvider] = None,
+                 ttl_seconds: float = 900.0, retry_seconds: float = 300.0):
+        self.data_dir = data_dir
+        self._provider = provider
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._checked: Dict[str, float] = {}  # symbol -> monotonic time of the last successful check
+        self._failed: Dict[str, float] = {}  # symbol -> monotonic time of the last failed check
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.data_dir, exist_ok=True)
+
+    @property
+    def provider(self) -> MarketDataProvider:
+        # Resolved on first refresh so the process-wide provider choice applies
+        return self._provider or get_market_data()
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.data_dir, f"{symbol.upper()}.npy")
+
+    def _read(self, symbol: str) -> np.ndarray:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    def _write(self, symbol: str, bars: np.ndarray):
+        path = self._path(symbol)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, bars)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _to_bars(frame: pd.DataFrame) -> np.ndarray:
+        bars = np.empty(len(frame), dtype=BAR_DTYPE)
+        if len(frame):
+            bars["date"] = pd.DatetimeIndex(frame.index).tz_localize(None).values.astype("datetime64[D]")
+            for column in COLUMNS:
+                bars[column] = frame[column].to_numpy(dtype=np.float64)
+        return bars
+
+    @staticmethod
+    def _to_frame(bars: np.ndarray) -> pd.DataFrame:
+        frame = pd.DataFrame({column: np.asarray(bars[column]) for column in COLUMNS},
+                             index=pd.DatetimeIndex(np.asarray(bars["date"]), name="Date"))
+        return frame
+
+    def _needs_refresh(self, symbol: str, now: float) -> bool:
+        # Caller holds the lock
+        checked_at = self._checked.get(symbol)
+        if checked_at is not None and now - checked_at < self.ttl_seconds:
+            return False
+        failed_at = self._failed.get(symbol)
+        return failed_at is None or now - failed_at >= self.retry_seconds
+
+    def _merge(self, symbol: str, existing: np.ndarray, fresh: pd.DataFrame):
+        new_bars = self._to_bars(fresh)
+        if len(new_bars) == 0:
+            return
+        keep = existing[existing["date"] < new_bars["date"].min()]
+        self._write(symbol, np.concatenate([np.asarray(keep), new_bars]))
+
+    def refresh(self, symbols: Iterable[str], start: str = DEFAULT_START):
+        """
+        Append any missing bars for `symbols`, one upstream call per start date
+
+        Args:
+            symbols: Stock symbols to bring up to date
+            start: First date to download for symbols with no stored history
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+
+        claimed, pending = [], []
+        with self._lock:
+            now = time.monotonic()
+            for symbol in symbols:
+                if symbol in self._inflight:
+                    pending.append(self._inflight[symbol])
+                elif self._needs_refresh(symbol, now):
+                    self._inflight[symbol] = threading.Event()
+                    claimed.append(symbol)
+
+        if claimed:
+            try:
+                self._download(claimed, start)
+            finally:
+                with self._lock:
+                    for symbol in claimed:
+                        self._inflight.pop(symbol).set()
+
+        for event in pending:
+            event.wait()
+
+    def _download(self, stale: List[str], start: str):
+        # Runs unlocked: only this thread writes the claimed symbols' files
+        existing = {s: self._read(s) for s in stale}
+        groups: Dict[date, List[str]] = {}
+        for symbol, bars in existing.items():
+            first = pd.Timestamp(bars["date"][-1]).date() if len(bars) else pd.Timestamp(start).date()
+            groups.setdefault(first, []).append(symbol)
+        end = datetime.now().date() + timedelta(days=1)
+
+        for first, group in groups.items():
+            try:
+                fetched = self.provider.history(group, first, end)
+            except Exception as e:
+                print(f"⚠️ Price refresh failed, serving stored bars (retry in {self.retry_seconds:.0f}s): {e}")
+                with self._lock:
+                    failed_at = time.monotonic()
+                    for symbol in group:
+                        self._failed[symbol] = failed_at
+                continue
+
+            for symbol in group:
+                frame = fetched.get(symbol)
+                if frame is not None and len(frame):
+                    self._merge(symbol, existing[symbol], frame[frame.index >= pd.Timestamp(first)])
+            with self._lock:
+                checked_at = time.monotonic()
+                for symbol in group:
+                    self._checked[symbol] = checked_at
+                    self._failed.pop(symbol, None)
+
+    def get_history(self, symbol: str, start=None, end=None, refresh: bool = True) -> pd.DataFrame:
+        """
+        Return stored daily bars for `symbol` as a Date-indexed OHLCV frame
+
+        Args:
+            symbol: Stock symbol
+            start: Optional first date (inclusive)
+            end: Optional last date (exclusive, like yfinance)
+            refresh: Pull missing bars from the provider first
+
+        Returns:
+            DataFrame with Open/High/Low/Close/Volume columns
+        """
+        return self.get_histories([symbol], start, end, refresh)[symbol.upper()]
+
+    def get_histories(self, symbols: Iterable[str], start=None, end=None, refresh: bool = True) -> Dict[str, pd.DataFrame]:
+        """Like get_history for several symbols, with one batched refresh"""
+        symbols = [s.upper() for s in symbols]
+        if refresh:
+            self.refresh(symbols)
+
+        frames = {}
+        for symbol in symbols:
+            bars = self._read(symbol)
+            if start is not None:
+                bars = bars[bars["date"] >= np.datetime64(pd.Timestamp(start).date())]
+            if end is not None:
+                bars = bars[bars["date"] < np.datetime64(pd.Timestamp(end).date())]
+            frames[symbol] = self._to_frame(bars)
+        return frames
+
+    def last_date(self, symbol: str) -> Optional[str]:
+        """Date of the newest stored bar, or None"""
+        bars = self._read(symbol)
+        return str(bars["date"][-1]) if len(bars) else None
+
+
+# Create singleton instance
+price_store = PriceStore(
+    os.getenv("PRICE_DATA_DIR", DEFAULT_DATA_DIR),
+    ttl_seconds=float(os.getenv("PRICE_REFRESH_TTL_SECONDS", "900")),
+    retry_seconds=float(os.getenv("PRICE_REFRESH_RETRY_SECONDS", "300")),
+)
@@ -0,0 +1,281 @@
+# quote_cache.py - Shared per-symbol quote cache with stale-while-revalidate
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from backend_process.utils.market_data import get_market_data
+
+
+def fetch_quote(symbol: str) -> Optional[Dict]:
+    """
+    Latest price plus company details for one symbol from the market data provider
+
+    Returns:
+        Quote dictionary, or None when the provider has no data for the symbol
+    """
+    return get_market_data().info(symbol)
+
+
+def fetch_quotes(symbols: List[str]) -> Dict[str, Dict]:
+    """
+    Latest and previous close for many symbols in one provider call
+
+    Returns:
+        {symbol: price quote} for every symbol the provider returned data for.
+        These quotes carry prices only (no company details).
+    """
+    return get_market_data().quotes(list(symbols))
+
+
+def quotes_to_columns(quotes: Dict[str, Optional[Dict]]) -> Dict[str, List]:
+    """
+    Compact columnar form of {symbol: quote}: one list per field, plus the
+    symbols that had no data under `missing`
+    """
+    columns = {"symbol": [], "price": [], "previousClose": [], "currency": [], "fetchedAt": [], "missing": []}
+    for symbol, quote in quotes.items():
+        if not quote:
+            columns["missing"].append(symbol)
+            continue
+        columns["symbol"].append(symbol)
+        columns["price"].append(quote.get("currentPrice"))
+        columns["previousClose"].append(quote.get("previousClose"))
+        columns["currency"].append(quote.get("currency"))
+        columns["fetchedAt"].append(round(quote["fetched_at"], 3))
+    return columns
+
+
+class QuoteCache:
+    """
+    Keeps recent quotes in memory so repeated lookups skip Yahoo.
+
+    A quote younger than `ttl` is served as is. Between `ttl` and
+    `ttl + stale_ttl` the cached quote is still served while one background
+    refresh replaces it. Older or missing quotes are fetched inline, and
+    concurrent callers for the same symbol share that single fetch. Symbols
+    with no data are cached too, so bad tickers do not hit Yahoo on every call.
+
+    `get_many` serves a whole portfolio with at most one upstream call. The
+    price-only quotes it stores are merged into existing entries; `get` treats
+    an entry without company details as a miss.
+    """
+
+    def __init__(self, ttl: float = 30.0, stale_ttl: float = 300.0, max_entries: int = 1000,
+                 fetcher: Callable[[str], Optional[Dict]] = fetch_quote,
+                 bulk_fetcher: Callable[[List[str]], Dict[str, Dict]] = fetch_quotes, workers: int = 4):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.fetcher = fetcher
+        self.bulk_fetcher = bulk_fetcher
+        self.workers = workers
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """
+        Quote for `symbol`, from memory when possible
+
+        Args:
+            symbol: Ticker symbol (case-insensitive)
+
+        Returns:
+            Quote dictionary (with `fetched_at`), or None when the symbol has no data
+        """
+        symbol = symbol.strip().upper()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry and not entry["partial"]:
+                age = now - entry["fetched_at"]
+                if age < self.ttl:
+                    self._entries.move_to_end(symbol)
+                    self.hits += 1
+                    return entry["quote"]
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(symbol)
+                    self.stale_hits += 1
+                    self._refresh_async(symbol)
+                    return entry["quote"]
+            self.misses += 1
+            future = self._inflight.get(symbol)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[symbol] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            quote = self._fetch(symbol)
+            future.set_result(quote)
+            return quote
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(symbol, None)
+
+    def get_many(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Price quotes for many symbols with at most one upstream call
+
+        Fresh entries are served from memory. If any symbol is missing or
+        expired, every non-fresh symbol is fetched in one multi-ticker download;
+        if only stale entries remain they are served and refreshed in the
+        background, also as one download.
+
+        Returns:
+            {symbol: quote or None}, in the order requested
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        now = time.time()
+        result, stale, missing = {}, [], []
+        with self._lock:
+            for symbol in symbols:
+                entry = self._entries.get(symbol)
+                age = now - entry["fetched_at"] if entry else None
+                if entry and age < self.ttl:
+                    self._entries.move_to_end(symbol)
+                    self.hits += 1
+                    result[symbol] = entry["quote"]
+                elif entry and entry["quote"] and age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    result[symbol] = entry["quote"]
+                    stale.append(symbol)
+                else:
+                    self.misses += 1
+                    missing.append(symbol)
+
+            if stale and not missing:
+                pending = [s for s in stale if s not in self._inflight]
+                if pending:
+                    self._refresh_many_async(pending)
+
+        if missing:
+            try:
+                result.update(self._fetch_many(missing + stale))
+            except Exception as e:
+                # Serve whatever is cached (stale) for the symbols that failed
+                print(f"⚠️ Bulk quote download failed: {str(e)}")
+                for symbol in missing:
+                    result[symbol] = self.peek(symbol)
+        return {s: result.get(s) for s in symbols}
+
+    def put(self, symbol: str, quote: Optional[Dict]):
+        """Store a quote fetched elsewhere (e.g. by a multi-symbol download)"""
+        with self._lock:
+            self._store(symbol.strip().upper(), quote)
+
+    def peek(self, symbol: str) -> Optional[Dict]:
+        """Cached quote regardless of age, without fetching"""
+        with self._lock:
+            entry = self._entries.get(symbol.strip().upper())
+            return entry["quote"] if entry else None
+
+    def stats(self) -> Dict:
+        """Return cache occupancy and hit counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
+
+    def _fetch(self, symbol: str) -> Optional[Dict]:
+        quote = self.fetcher(symbol)
+        if quote is not None:
+            quote = dict(quote, fetched_at=time.time())
+        with self._lock:
+            self._store(symbol, quote)
+        return quote
+
+    def _fetch_many(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        fetched = self.bulk_fetcher(symbols)
+        now = time.time()
+        result = {}
+        with self._lock:
+            for symbol in symbols:
+                quote = fetched.get(symbol)
+                entry = self._entries.get(symbol)
+                if quote is None:
+                    # No data this time: keep a cached quote rather than forgetting it
+                    result[symbol] = entry["quote"] if entry else None
+                    if not entry:
+                        self._store(symbol, None, partial=True)
+                    continue
+                # Keep company details from an earlier full quote
+                details = entry["quote"] if entry and entry["quote"] else {}
+                merged = dict(details, **quote, fetched_at=now)
+                self._store(symbol, merged, partial=bool(entry and entry["partial"]) or not details)
+                result[symbol] = merged
+        return result
+
+    def _refresh_many_async(self, symbols: List[str]):
+        # Caller holds the lock
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="quote-refresh")
+        futures = {}
+        for symbol in symbols:
+            futures[symbol] = self._inflight[symbol] = Future()
+        self._executor.submit(self._background_refresh_many, symbols, futures)
+
+    def _background_refresh_many(self, symbols: List[str], futures: Dict[str, Future]):
+        try:
+            fetched = self._fetch_many(symbols)
+        except Exception as e:
+            print(f"⚠️ Background bulk quote refresh failed: {str(e)}")
+            fetched = {}
+        with self._lock:
+            for symbol in symbols:
+                self._inflight.pop(symbol, None)
+        for symbol, future in futures.items():
+            future.set_result(fetched.get(symbol, self.peek(symbol)))
+
+    def _store(self, symbol: str, quote: Optional[Dict], partial: bool = False):
+        self._entries[symbol] = {"quote": quote, "fetched_at": time.time(), "partial": partial}
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _refresh_async(self, symbol: str):
+        # Caller holds the lock; at most one refresh per symbol is in flight
+        if symbol in self._inflight:
+            return
+        if self._executor is None:
+            # Only stale hits refresh in the background; a cache that never serves stale needs no pool
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="quote-refresh")
+        future = Future()
+        self._inflight[symbol] = future
+        self._executor.submit(self._background_refresh, symbol, future)
+
+    def _background_refresh(self, symbol: str, future: Future):
+        try:
+            future.set_result(self._fetch(symbol))
+        except Exception as e:
+            # Keep serving the stale quote; the next stale hit retries
+            print(f"⚠️ Background quote refresh failed for {symbol}: {str(e)}")
+            future.set_result(self.peek(symbol))
+        finally:
+            with self._lock:
+                self._inflight.pop(symbol, None)
+
+
+# Create singleton instance
+quote_cache = QuoteCache(
+    ttl=float(os.getenv("QUOTE_CACHE_TTL_SECONDS", "30")),
+    stale_ttl=float(os.getenv("QUOTE_CACHE_STALE_SECONDS", "300")),
+    max_entries=int(os.getenv("QUOTE_CACHE_MAX_ENTRIES", "1000")),
+)
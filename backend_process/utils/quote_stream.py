@@ -0,0 +1,140 @@
+# quote_stream.py - One shared quote poller fanned out to streaming subscribers
+import itertools
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from backend_process.utils.quote_cache import quote_cache
+
+
+class Subscription:
+    """One connected client: its symbols and a bounded queue of pending updates"""
+
+    def __init__(self, sub_id: int, symbols: Iterable[str], max_pending: int):
+        self.id = sub_id
+        self.symbols = frozenset(symbols)
+        self.updates: "queue.Queue[Dict]" = queue.Queue(maxsize=max_pending)
+
+    def push(self, quotes: Dict[str, Optional[Dict]]):
+        # A slow client loses its oldest update rather than blocking the poller
+        while True:
+            try:
+                self.updates.put_nowait(quotes)
+                return
+            except queue.Full:
+                try:
+                    self.updates.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def next(self, timeout: float) -> Optional[Dict]:
+        """Next update, or None if nothing arrived within `timeout` seconds"""
+        try:
+            return self.updates.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class QuoteStream:
+    """
+    Polls prices for the union of all subscribers' symbols on one thread.
+
+    Every `interval` seconds the poller asks the quote cache for every
+    subscribed symbol at once (one multi-ticker download at most). Each
+    subscriber then receives only its own symbols whose price changed since the
+    last poll. Upstream load therefore grows with distinct symbols, not with
+    connected clients. The poller starts with the first subscriber and exits
+    when the last one leaves.
+    """
+
+    def __init__(self, interval: float = 15.0, max_pending: int = 10):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._subscribers: Dict[int, Subscription] = {}
+        self._last_prices: Dict[str, Optional[float]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+        self.polls = 0
+
+    def subscribe(self, symbols: Iterable[str]) -> Subscription:
+        """Register a client; its first update is the current snapshot of its symbols"""
+        symbols = [s.strip().upper() for s in symbols if s and s.strip()]
+        subscription = Subscription(next(self._ids), symbols, self.max_pending)
+        snapshot = quote_cache.get_many(symbols)
+        subscription.push(snapshot)
+
+        with self._lock:
+            self._subscribers[subscription.id] = subscription
+            # The snapshot is the baseline for symbols nobody else is watching yet
+            for symbol, quote in snapshot.items():
+                self._last_prices.setdefault(symbol, quote.get("currentPrice") if quote else None)
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._run, daemon=True, name="quote-stream")
+                self._poller.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.pop(subscription.id, None)
+            if not self._subscribers:
+                self._wake.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            symbols = set().union(*(s.symbols for s in self._subscribers.values())) if self._subscribers else set()
+            return {"subscribers": len(self._subscribers), "symbols": len(symbols), "polls": self.polls}
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._subscribers:
+                    self._poller = None
+                    self._last_prices.clear()
+                    return
+                subscribers = list(self._subscribers.values())
+            try:
+                self._poll(subscribers)
+            except Exception as e:
+                print(f"⚠️ Quote stream poll failed: {str(e)}")
+
+    def _poll(self, subscribers):
+        symbols = sorted(set().union(*(s.symbols for s in subscribers)))
+        started = time.time()
+        quotes = quote_cache.get_many(symbols)
+
+        # subscribe() seeds _last_prices from request threads, so diff under the same lock
+        changed = {}
+        with self._lock:
+            self.polls += 1
+            # Forget symbols nobody subscribes to any more (checked now, not at the snapshot)
+            current = set().union(*(s.symbols for s in self._subscribers.values())) if self._subscribers else set()
+            for symbol in set(self._last_prices) - current:
+                del self._last_prices[symbol]
+
+            for symbol, quote in quotes.items():
+                price = quote.get("currentPrice") if quote else None
+                if self._last_prices.get(symbol, object()) != price:
+                    changed[symbol] = quote
+                    self._last_prices[symbol] = price
+        if not changed:
+            return
+
+        for subscription in subscribers:
+            update = {s: q for s, q in changed.items() if s in subscription.symbols}
+            if update:
+                subscription.push(update)
+        print(f"📡 Streamed {len(changed)}/{len(symbols)} changed quotes to {len(subscribers)} clients "
+              f"({(time.time() - started) * 1000:.0f} ms)")
+
+
+# Create singleton instance
+quote_stream = QuoteStream(
+    interval=float(os.getenv("STREAM_POLL_SECONDS", "15")),
+    max_pending=int(os.getenv("STREAM_MAX_PENDING", "10")),
+)
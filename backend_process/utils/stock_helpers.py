@@ -4,18 +4,25 @@ from typing import List, Dict, Optional
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from db_connection.db import db
+from db_connection.db import get_collection
+from bson import ObjectId
 from flask import request
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 class UserStocksHelper:
     """Helper class for managing user stocks in MongoDB UserStocks collection"""
     
     def __init__(self):
-        self.collection = db.UserStocks  # New collection for user stocks
+        self.collection = get_collection('UserStocks')  # New collection for user stocks
     
     def add_stock(self, user_id: str, stock_data: Dict) -> Dict:
         """
-        Add a new stock to user's portfolio
+        Add a stock to user's portfolio, or update it if the user already holds it
+
+        One atomic upsert: provided fields are set, creation fields are only
+        written when the document is inserted. The pre-update document tells
+        an insert (None) from an update.
         
         Args:
             user_id: User identifier
@@ -29,48 +36,39 @@ class UserStocksHelper:
             if not user_id or not stock_data.get('symbol'):
                 return {"error": "Missing required fields: user_id and symbol", "success": False}
             
-            symbol = stock_data.get('symbol').upper()
-            
-            # Check if stock already exists for this user
-            existing = self.collection.find_one({
-                "user_id": user_id, 
-                "symbol": symbol
-            })
+            symbol = stock_data.get('symbol').strip().upper()
+            now = self._now()
             
-            if existing:
-                # Update existing stock instead of just returning it
-                print(f"🔄 Stock {symbol} already exists, updating with new data...")
-                update_result = self.update_stock(user_id, symbol, stock_data)
-                if update_result["success"]:
-                    return {"message": "Stock updated successfully", "success": True, "data": update_result["data"]}
-                else:
-                    return update_result
-            
-            # Prepare stock document
-            stock_document = {
-                "user_id": user_id,
-                "symbol": symbol,
-                "name": stock_data.get("longName") or stock_data.get("company") or stock_data.get("name") or "",
-                "exchange": stock_data.get("exchange") or "",
-                "currency": stock_data.get("currency") or "USD",
-                "sector": stock_data.get("sector") or "",
-                "qty": self._safe_int(stock_data.get("qty")),
-                "buy_price": self._safe_float(stock_data.get("buy") or stock_data.get("buy_price") or stock_data.get("buyPrice")),
-                "current_price": self._safe_float(stock_data.get("current") or stock_data.get("currentPrice") or stock_data.get("current_price")),
-                "date": stock_data.get("date") or datetime.utcnow().strftime("%Y-%m-%d"),
-                "ip_address": request.remote_addr if request else "unknown",
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
+            update = self._upsert_doc(stock_data, now)
+            # Chosen here so the inserted document can be returned without reading it back
+            update["$setOnInsert"]["_id"] = ObjectId()
+            for attempt in range(2):
+                try:
+                    previous = self.collection.find_one_and_update(
+                        {"user_id": user_id, "symbol": symbol},
+                        update,
+                        upsert=True,
+                        return_document=ReturnDocument.BEFORE
+                    )
+                    break
+                except DuplicateKeyError:
+                    # A concurrent save inserted the same (user_id, symbol) first; retrying updates it
+                    if attempt:
+                        raise
             
-            # Insert into UserStocks collection
-            result = self.collection.insert_one(stock_document)
-            stock_document['_id'] = str(result.inserted_id)
+            stock_document = dict(previous) if previous else {"user_id": user_id, "symbol": symbol, **update["$setOnInsert"]}
+            stock_document.update(update["$set"])
+            stock_document['_id'] = str(stock_document['_id'])
             
-            print(f"✅ Stock added to UserStocks collection - User: {user_id}, Symbol: {symbol}")
+            if previous is None:
+                print(f"✅ Stock added to UserStocks collection - User: {user_id}, Symbol: {symbol}")
+                message = "Stock added successfully to UserStocks"
+            else:
+                print(f"🔄 Stock {symbol} already existed, updated with new data")
+                message = "Stock updated successfully"
             
             return {
-                "message": "Stock added successfully to UserStocks",
+                "message": message,
                 "success": True,
                 "data": stock_document
             }
@@ -79,6 +77,63 @@ class UserStocksHelper:
             print(f"❌ Error adding stock to UserStocks: {str(e)}")
             return {"error": f"Failed to add stock: {str(e)}", "success": False}
     
+    def import_stocks(self, user_id: str, rows: List[Dict]) -> Dict:
+        """
+        Add or update many holdings with one unordered bulk write
+        
+        Args:
+            user_id: User identifier
+            rows: Stock dictionaries (same fields as add_stock)
+            
+        Returns:
+            Dictionary with inserted/updated counts and the rows that were skipped
+        """
+        try:
+            if not user_id:
+                return {"error": "Missing user_id", "success": False}
+            
+            now = self._now()
+            skipped = []
+            by_symbol = {}
+            for i, row in enumerate(rows):
+                symbol = str((row or {}).get("symbol") or "").strip().upper()
+                if not symbol:
+                    skipped.append({"row": i + 1, "error": "Missing symbol"})
+                    continue
+                # Later rows for the same symbol win, so one upsert per document
+                by_symbol.setdefault(symbol, {}).update(row)
+            
+            if not by_symbol:
+                return {"error": "No valid rows to import", "success": False, "skipped": skipped}
+            
+            operations = [
+                UpdateOne({"user_id": user_id, "symbol": symbol}, self._upsert_doc(row, now), upsert=True)
+                for symbol, row in by_symbol.items()
+            ]
+            try:
+                result = self.collection.bulk_write(operations, ordered=False).bulk_api_result
+            except BulkWriteError as e:
+                # Unordered: every other row was still applied
+                result = e.details
+                for error in result.get("writeErrors", []):
+                    skipped.append({"symbol": list(by_symbol)[error["index"]], "error": error.get("errmsg")})
+            
+            print(f"📥 Imported {len(operations)} stocks for user {user_id} - "
+                  f"{result.get('nUpserted', 0)} added, {result.get('nModified', 0)} updated, {len(skipped)} skipped")
+            
+            return {
+                "message": "Stocks imported successfully",
+                "success": True,
+                "inserted": result.get("nUpserted", 0),
+                "updated": result.get("nModified", 0),
+                "unchanged": result.get("nMatched", 0) - result.get("nModified", 0),
+                "skipped": skipped
+            }
+            
+        except Exception as e:
+            print(f"❌ Error importing stocks: {str(e)}")
+            return {"error": f"Failed to import stocks: {str(e)}", "success": False}
+    
     def get_user_stocks(self, user_id: str) -> Dict:
         """
         Retrieve all stocks for a specific user
@@ -129,44 +184,19 @@ class UserStocksHelper:
             if not user_id or not symbol:
                 return {"error": "Missing user_id or symbol", "success": False}
             
-            # Prepare update document
-            update_doc = {"updated_at": datetime.utcnow()}
-            
-            # Add fields that are provided (handle multiple field name variations)
-            if "qty" in update_data:
-                update_doc["qty"] = self._safe_int(update_data["qty"])
-            if any(key in update_data for key in ["buy_price", "buy", "buyPrice"]):
-                update_doc["buy_price"] = self._safe_float(update_data.get("buy_price") or update_data.get("buy") or update_data.get("buyPrice"))
-            if any(key in update_data for key in ["current_price", "current", "currentPrice"]):
-                update_doc["current_price"] = self._safe_float(update_data.get("current_price") or update_data.get("current") or update_data.get("currentPrice"))
-            if "date" in update_data:
-                update_doc["date"] = update_data["date"]
-            
-            # Also update company name and other info if provided
-            if any(key in update_data for key in ["longName", "company", "name"]):
-                update_doc["name"] = update_data.get("longName") or update_data.get("company") or update_data.get("name")
-            if "currency" in update_data:
-                update_doc["currency"] = update_data.get("currency")
-            if "exchange" in update_data:
-                update_doc["exchange"] = update_data.get("exchange")
-            if "sector" in update_data:
-                update_doc["sector"] = update_data.get("sector")
-            
-            # Update the stock
-            result = self.collection.update_one(
+            update_doc = dict(self._update_fields(update_data), updated_at=datetime.utcnow())
+            
+            # Update and read back in one round trip
+            updated_stock = self.collection.find_one_and_update(
                 {"user_id": user_id, "symbol": symbol.upper()},
-                {"$set": update_doc}
+                {"$set": update_doc},
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.matched_count == 0:
+            if updated_stock is None:
                 return {"error": "Stock not found", "success": False}
             
-            # Get updated document
-            updated_stock = self.collection.find_one(
-                {"user_id": user_id, "symbol": symbol.upper()},
-                {"_id": 0}
-            )
-            
             print(f"📝 Stock updated in UserStocks - User: {user_id}, Symbol: {symbol}")
             
             return {
@@ -220,6 +250,62 @@ class UserStocksHelper:
         except Exception:
             return 0
     
+    def _update_fields(self, data: Dict) -> Dict:
+        """
+        Stock fields present in `data` (handles multiple field name variations)
+
+        Empty descriptive fields (name, currency, exchange, sector, date) are
+        left out, so a blank form value never overwrites stored details or the
+        insert defaults.
+        """
+        fields = {}
+        if "qty" in data:
+            fields["qty"] = self._safe_int(data["qty"])
+        if any(key in data for key in ["buy_price", "buy", "buyPrice"]):
+            fields["buy_price"] = self._safe_float(data.get("buy_price") or data.get("buy") or data.get("buyPrice"))
+        if any(key in data for key in ["current_price", "current", "currentPrice"]):
+            fields["current_price"] = self._safe_float(data.get("current_price") or data.get("current") or data.get("currentPrice"))
+        
+        # Company name and other info
+        details = {
+            "date": data.get("date"),
+            "name": data.get("longName") or data.get("company") or data.get("name"),
+            "currency": data.get("currency"),
+            "exchange": data.get("exchange"),
+            "sector": data.get("sector"),
+        }
+        for field, value in details.items():
+            if isinstance(value, str):
+                value = value.strip()
+            if value:
+                fields[field] = value
+        return fields
+    
+    def _upsert_doc(self, data: Dict, now: datetime) -> Dict:
+        """$set for provided fields, $setOnInsert defaults for the rest"""
+        set_fields = dict(self._update_fields(data), updated_at=now)
+        defaults = {
+            "name": "",
+            "exchange": "",
+            "currency": "USD",
+            "sector": "",
+            "qty": None,
+            "buy_price": None,
+            "current_price": None,
+            "date": now.strftime("%Y-%m-%d"),
+            "ip_address": request.remote_addr if request else "unknown",
+            "created_at": now
+        }
+        # A field may not appear in both operators
+        on_insert = {k: v for k, v in defaults.items() if k not in set_fields}
+        return {"$set": set_fields, "$setOnInsert": on_insert}
+    
+    @staticmethod
+    def _now() -> datetime:
+        # Millisecond precision, as stored by MongoDB, so the document add_stock returns matches the stored one
+        now = datetime.utcnow()
+        return now.replace(microsecond=now.microsecond // 1000 * 1000)
+    
     def _safe_int(self, value) -> Optional[int]:
         """Safely convert value to integer"""
         if value is None or value == '':
@@ -0,0 +1,227 @@
+# symbol_index.py - In-process symbol/company autocomplete index
+import bisect
+import csv
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_LISTING = os.path.join(BASE_DIR, "data", "symbols.csv")
+DEFAULT_LEARNED = os.path.join(BASE_DIR, "data", "symbols_learned.csv")
+
+FIELDS = ["symbol", "shortname", "exchange", "currency"]
+
+
+class SymbolIndex:
+    """
+    Prefix search over symbols and company names using sorted key arrays.
+
+    Two sorted lists hold (key, position) pairs: one keyed by upper-cased
+    symbol, one by each lower-cased word of the company name (and the whole
+    name). A prefix lookup is a `bisect` to the first candidate followed by a
+    short scan, so autocomplete is answered in microseconds.
+
+    The index starts from a bundled listing file and learns every symbol that
+    Yahoo search returns. Only true misses, queries with no local match at all,
+    go upstream, once per query; the symbols Yahoo returned are remembered and
+    merged into later answers for the same query. Learned symbols are appended
+    to a local file and reloaded on the next start.
+    """
+
+    def __init__(self, listing_path: str = DEFAULT_LISTING, learned_path: Optional[str] = DEFAULT_LEARNED,
+                 max_remembered_queries: int = 5000):
+        self.listing_path = listing_path
+        self.learned_path = learned_path
+        self.max_remembered_queries = max_remembered_queries
+        self._records: List[Dict] = []
+        self._positions: Dict[str, int] = {}
+        self._symbol_keys: List[tuple] = []
+        self._name_keys: List[tuple] = []
+        self._queries: "OrderedDict[str, List[str]]" = OrderedDict()  # query -> symbols upstream returned
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    # ----- loading -----
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for path in (self.listing_path, self.learned_path):
+                if path and os.path.exists(path):
+                    with open(path, newline="", encoding="utf-8") as f:
+                        for row in csv.DictReader(f):
+                            self._add(row)
+            self._loaded = True
+            print(f"🔎 Symbol index loaded: {len(self._records)} symbols")
+
+    @staticmethod
+    def _name_tokens(name: str) -> List[str]:
+        name = name.lower().strip()
+        words = [w for w in re.split(r"[^a-z0-9&]+", name) if w]
+        return list(dict.fromkeys(([name] if name else []) + words))
+
+    def _add(self, row: Dict) -> bool:
+        # Caller holds the lock. Returns True for a symbol not seen before.
+        symbol = (row.get("symbol") or "").strip().upper()
+        if not symbol:
+            return False
+        record = {field: (row.get(field) or "").strip() for field in FIELDS}
+        record["symbol"] = symbol
+
+        position = self._positions.get(symbol)
+        if position is not None:
+            # Fill in details an earlier source left blank
+            existing = self._records[position]
+            for field in FIELDS:
+                if not existing[field] and record[field]:
+                    existing[field] = record[field]
+            return False
+
+        position = len(self._records)
+        self._records.append(record)
+        self._positions[symbol] = position
+        bisect.insort(self._symbol_keys, (symbol, position))
+        for token in self._name_tokens(record["shortname"]):
+            bisect.insort(self._name_keys, (token, position))
+        return True
+
+    # ----- lookup -----
+
+    @staticmethod
+    def _prefix_scan(keys: List[tuple], prefix: str, out: List[int], limit: int):
+        i = bisect.bisect_left(keys, (prefix, -1))
+        while i < len(keys) and len(out) < limit and keys[i][0].startswith(prefix):
+            if keys[i][1] not in out:
+                out.append(keys[i][1])
+            i += 1
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Symbols whose ticker or company-name word starts with `query`
+
+        Exact ticker matches come first, then ticker prefixes, then name matches.
+
+        Returns:
+            Up to `limit` records with symbol, shortname, exchange and currency
+        """
+        self._ensure_loaded()
+        query = query.strip()
+        if not query:
+            return []
+
+        positions: List[int] = []
+        with self._lock:
+            exact = self._positions.get(query.upper())
+            if exact is not None:
+                positions.append(exact)
+            self._prefix_scan(self._symbol_keys, query.upper(), positions, limit)
+            self._prefix_scan(self._name_keys, query.lower(), positions, limit)
+            return [dict(self._records[p]) for p in positions[:limit]]
+
+    def lookup(self, query: str, upstream: Callable[[str], List[Dict]], source: str,
+               limit: int = 10) -> Tuple[List[Dict], str]:
+        """
+        Local matches, or `upstream` results when the index has none
+
+        Only a true miss goes upstream, at most once per query per process; a
+        keystroke prefix with any local match is answered in-process. Upstream
+        results are learned, and on repeats of the query they are merged after
+        the local matches (Yahoo also matches names the prefix index does not).
+
+        Args:
+            query: Search text
+            upstream: Search function returning symbol records (e.g. the market data provider)
+            source: Name reported when upstream contributed results
+
+        Returns:
+            (up to `limit` records, "local" or `source`)
+        """
+        local = self.search(query, limit)
+        if len(local) >= limit:
+            return local, "local"
+
+        key = query.strip().lower()
+        with self._lock:
+            remembered = self._queries.get(key)
+            if remembered is not None:
+                self._queries.move_to_end(key)
+                remote = [dict(self._records[self._positions[s]]) for s in remembered]
+        if remembered is None:
+            if local:
+                return local, "local"
+            remote = upstream(query)
+            self.learn(query, remote)
+
+        # Remembered upstream rows include names that are not prefixes, so merge rather than re-search
+        seen = {r["symbol"] for r in local}
+        merged = list(local)
+        for row in remote:
+            symbol = (row.get("symbol") or "").strip().upper()
+            if symbol and symbol not in seen:
+                seen.add(symbol)
+                merged.append(row)
+        merged = merged[:limit]
+        fresh = remembered is None and len(merged) > len(local)
+        return merged, source if fresh else "local"
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Listing record for an exact ticker, or None"""
+        self._ensure_loaded()
+        with self._lock:
+            position = self._positions.get(symbol.strip().upper())
+            return dict(self._records[position]) if position is not None else None
+
+    def answered_upstream(self, query: str) -> bool:
+        """True if Yahoo was already asked this query in this process"""
+        key = query.strip().lower()
+        with self._lock:
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return True
+            return False
+
+    def learn(self, query: str, results: List[Dict]) -> int:
+        """
+        Add upstream search results to the index and remember the query
+
+        Returns:
+            Number of symbols that were new to the index
+        """
+        self._ensure_loaded()
+        with self._lock:
+            new_rows = [row for row in results if self._add(row)]
+            self._queries[query.strip().lower()] = list(dict.fromkeys(
+                (r.get("symbol") or "").strip().upper() for r in results if (r.get("symbol") or "").strip()))
+            while len(self._queries) > self.max_remembered_queries:
+                self._queries.popitem(last=False)
+            records = [self._records[self._positions[r["symbol"].strip().upper()]] for r in new_rows]
+
+        if records and self.learned_path:
+            try:
+                write_header = not os.path.exists(self.learned_path)
+                # Small appends are atomic, so several workers can share the file
+                with open(self.learned_path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=FIELDS)
+                    if write_header:
+                        writer.writeheader()
+                    writer.writerows(records)
+            except OSError as e:
+                print(f"⚠️ Could not persist learned symbols: {str(e)}")
+        return len(records)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"symbols": len(self._records), "name_keys": len(self._name_keys),
+                    "remembered_queries": len(self._queries)}
+
+
+# Create singleton instance
+symbol_index = SymbolIndex(
+    listing_path=os.getenv("SYMBOL_LISTING_FILE", DEFAULT_LISTING),
+    learned_path=os.getenv("SYMBOL_LEARNED_FILE", DEFAULT_LEARNED) or None,
+)
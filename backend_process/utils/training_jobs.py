@@ -0,0 +1,231 @@
+# training_jobs.py - Background training queue with persisted job state
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from db_connection.db import get_collection
+
+# Job fields callers see; `active` only exists to back the one-job-per-symbol index
+JOB_PROJECTION = {"_id": 0, "active": 0}
+
+
+def make_progress_callback(job_id: str, on_epoch):
+    """Build a Keras callback that reports each finished epoch"""
+    from tensorflow.keras.callbacks import Callback
+
+    class EpochProgress(Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            on_epoch(job_id, epoch + 1, (logs or {}).get("loss"))
+
+    return EpochProgress()
+
+
+def _run_job(job_id: str, symbol: str, train_kwargs: Dict) -> str:
+    """
+    Train one queued job inside a worker process
+
+    TensorFlow and the training code are only imported here, never in the
+    web process that submitted the job.
+
+    Returns:
+        Final job status
+    """
+    from backend_process.train_model import train_lstm_model
+
+    jobs = TrainingJobManager()
+    # Claim the job; it may have been declared dead while it sat in the queue
+    if not jobs._transition(job_id, "queued", {"status": "running", "started_at": datetime.utcnow()}):
+        print(f"⏭️ Training job {job_id} for {symbol} is no longer queued, skipping")
+        return "skipped"
+
+    try:
+        callback = make_progress_callback(job_id, jobs._on_epoch)
+        result = train_lstm_model(symbol, callbacks=[callback], **train_kwargs)
+        status = "done" if result.get("status") == "success" else "failed"
+        jobs._finish(job_id, status, result=result, error=result.get("reason") if status == "failed" else None)
+        print(f"✅ Training job {job_id} for {symbol} finished: {status}")
+        return status
+    except Exception as e:
+        print(f"❌ Training job {job_id} for {symbol} failed: {e}")
+        jobs._finish(job_id, "failed", error=str(e))
+        return "failed"
+
+
+class TrainingJobManager:
+    """
+    Runs `train_lstm_model` in separate worker processes, outside the web process.
+
+    Job state lives in the `training_jobs` collection so any web worker can
+    answer a status poll. A partial unique index allows one queued or running
+    job per symbol; submitting a symbol that already has one returns that job.
+
+    Running jobs write an `updated_at` heartbeat every epoch, and the web
+    process that queued a job refreshes it while the job waits for a worker.
+    An active job whose heartbeat is older than `stale_minutes` belonged to a
+    process that crashed or was restarted: it is marked failed so the symbol
+    can be trained again.
+    """
+
+    def __init__(self, max_workers: int = 1, threads_per_worker: int = 1, stale_minutes: float = 30.0):
+        self.collection = get_collection('training_jobs')
+        self.max_workers = max_workers
+        self.threads_per_worker = threads_per_worker
+        self.stale_minutes = stale_minutes
+        self._executor = None
+        self._executor_pid = None
+        self._queued = set()  # job_ids this process submitted that have not finished
+        self._heartbeat = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Worker processes start with the first job, so web workers that never train never spawn them
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                from backend_process.train_batch import _init_worker
+
+                # spawn: a fresh interpreter per worker, with its own TensorFlow runtime and Mongo client
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_init_worker,
+                                                     initargs=(self.threads_per_worker,))
+                self._executor_pid = os.getpid()
+                self._queued.clear()
+            if self._heartbeat is None or not self._heartbeat.is_alive():
+                self._heartbeat = threading.Thread(target=self._beat_queued, daemon=True, name="train-heartbeat")
+                self._heartbeat.start()
+            return self._executor
+
+    def _beat_queued(self):
+        # Keeps jobs waiting behind a long queue from looking abandoned
+        interval = self.stale_minutes * 60 / 3
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                queued = list(self._queued)
+            if not queued:
+                continue
+            try:
+                self.collection.update_many({"job_id": {"$in": queued}, "status": "queued", "active": True},
+                                            {"$set": {"updated_at": datetime.utcnow()}})
+            except Exception as e:
+                print(f"⚠️ Training job heartbeat failed: {e}")
+
+    def submit(self, symbol: str, **train_kwargs) -> Dict:
+        """
+        Queue a training run for `symbol`, or return the one already pending
+
+        Args:
+            symbol: Stock symbol to train
+            **train_kwargs: Extra keyword arguments for train_lstm_model
+
+        Returns:
+            Job document (without Mongo `_id`)
+        """
+        from pymongo.errors import DuplicateKeyError
+
+        symbol = symbol.upper()
+        self._expire_stale({"symbol": symbol})
+
+        now = datetime.utcnow()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "symbol": symbol,
+            "status": "queued",
+            "epoch": 0,
+            "epochs": train_kwargs.get("epochs", 50),
+            "loss": None,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        try:
+            self.collection.insert_one(dict(job, active=True))
+        except DuplicateKeyError:
+            existing = self.collection.find_one({"symbol": symbol, "active": True}, JOB_PROJECTION)
+            if existing:
+                existing["deduplicated"] = True
+                return existing
+            # The active job finished between the insert and the lookup
+            return self.submit(symbol, **train_kwargs)
+
+        try:
+            future = self._pool().submit(_run_job, job["job_id"], symbol, train_kwargs)
+        except Exception as e:
+            self._finish(job["job_id"], "failed", error=f"Could not start training worker: {e}")
+            raise
+        with self._lock:
+            self._queued.add(job["job_id"])
+        future.add_done_callback(lambda f, job_id=job["job_id"]: self._on_worker_exit(job_id, f))
+        print(f"🧵 Training job {job['job_id']} queued for {symbol}")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Fetch a job's current state"""
+        if not job_id:
+            return None
+        self._expire_stale({"job_id": job_id})
+        return self.collection.find_one({"job_id": job_id}, JOB_PROJECTION)
+
+    def _expire_stale(self, query: Dict) -> int:
+        """Mark active jobs without a recent heartbeat as failed; returns how many"""
+        cutoff = datetime.utcnow() - timedelta(minutes=self.stale_minutes)
+        result = self.collection.update_many(
+            dict(query, active=True, updated_at={"$lt": cutoff}),
+            {"$set": {"status": "failed", "error": "Training worker stopped responding",
+                      "finished_at": datetime.utcnow()},
+             "$unset": {"active": ""}}
+        )
+        if result.modified_count:
+            print(f"⚠️ Marked {result.modified_count} stale training job(s) failed")
+        return result.modified_count
+
+    def _transition(self, job_id: str, from_status: str, fields: Dict) -> bool:
+        result = self.collection.update_one(
+            {"job_id": job_id, "status": from_status, "active": True},
+            {"$set": dict(fields, updated_at=datetime.utcnow())}
+        )
+        return result.modified_count == 1
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"job_id": job_id, "active": True},
+            {"$set": {"status": status, "result": result, "error": error, "finished_at": now, "updated_at": now},
+             "$unset": {"active": ""}}
+        )
+
+    def _on_epoch(self, job_id: str, epoch: int, loss):
+        # Doubles as the heartbeat that keeps a running job from being declared dead
+        self.collection.update_one({"job_id": job_id}, {"$set": {
+            "epoch": epoch,
+            "loss": float(loss) if loss is not None else None,
+            "updated_at": datetime.utcnow(),
+        }})
+
+    def _on_worker_exit(self, job_id: str, future):
+        with self._lock:
+            self._queued.discard(job_id)
+        # A worker that died (BrokenProcessPool) never reported back; close its job here
+        if future.cancelled() or future.exception() is not None:
+            error = "cancelled" if future.cancelled() else str(future.exception())
+            print(f"❌ Training worker for job {job_id} exited abnormally: {error}")
+            self._finish(job_id, "failed", error=f"Training worker exited: {error}")
+            with self._lock:
+                self._executor = None
+
+
+# Create singleton instance
+training_jobs = TrainingJobManager(
+    max_workers=int(os.getenv("TRAIN_WORKERS", "1")),
+    threads_per_worker=int(os.getenv("TRAIN_THREADS_PER_WORKER", "2")),
+    stale_minutes=float(os.getenv("TRAINING_JOB_STALE_MINUTES", "30")),
+)
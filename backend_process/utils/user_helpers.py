@@ -3,10 +3,10 @@ from typing import Optional, Dict
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from db_connection.db import db
+from db_connection.db import get_collection
 
 def generate_user_id():
-    counters = db['counters']
+    counters = get_collection('counters')
     counter_doc = counters.find_one_and_update(
         {"_id": "user_id"},
         {"$inc": {"seq": 1}},
@@ -19,7 +19,7 @@ class UserHelper:
     """Helper class for managing user operations"""
     
     def __init__(self):
-        self.collection = db.users  # Users collection
+        self.collection = get_collection('users')  # Users collection
     
     def get_user_by_email(self, email: str) -> Optional[Dict]:
         """
@@ -0,0 +1,12 @@
+# wsgi.py - WSGI entrypoint: gunicorn backend_process.wsgi:app
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend_process.app import create_app
+
+app = create_app()
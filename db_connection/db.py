@@ -1,30 +1,183 @@
 # db_connection/db.py
 from pymongo import MongoClient
+from pymongo.database import Database
 import os
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
-mongo_uri = os.getenv("MONGO_URI")
-if not mongo_uri:
-    raise RuntimeError("The 'MONGO_URI' environment variable is not set.")
-
-client = MongoClient(mongo_uri)
-db = client["predictr_db"]
-
-# Initialize collections
-try:
-    # Ensure UserStocks collection exists with proper indexing
-    if "UserStocks" not in db.list_collection_names():
-        db.create_collection("UserStocks")
-        print("✅ UserStocks collection created")
-    
-    # Create indexes for better performance
-    db.UserStocks.create_index([("user_id", 1), ("symbol", 1)], unique=True)
-    db.UserStocks.create_index([("user_id", 1)])
-    db.UserStocks.create_index([("created_at", -1)])
-    
-    print("✅ Database and UserStocks collection initialized successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not initialize UserStocks collection: {e}")
-    print("   Collection will be created automatically when first document is inserted")
+DB_NAME = os.getenv("DB_NAME", "predictr_db")
+
+# Pool and timeout settings shared by every module in the process
+CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_MS", "60000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+    # Fail fast when every pooled connection is busy instead of queueing forever
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+    "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+}
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> MongoClient:
+    """
+    Return this process's MongoClient, creating it on first use
+
+    The client is rebuilt when the pid changes, so workers forked by a
+    preforking server never reuse sockets inherited from the parent.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            mongo_uri = os.getenv("MONGO_URI")
+            if not mongo_uri:
+                raise RuntimeError("The 'MONGO_URI' environment variable is not set.")
+            # MongoClient connects in the background; no server round trip happens here
+            _client = MongoClient(mongo_uri, **CLIENT_OPTIONS)
+            _client_pid = pid
+    return _client
+
+
+def get_db() -> Database:
+    """Return the application database on this process's client"""
+    return get_client()[DB_NAME]
+
+
+class _CollectionProxy:
+    """Collection handle that resolves against the current process's client on each use"""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self._name], attr)
+
+    def __repr__(self):
+        return f"<collection {DB_NAME}.{self._name}>"
+
+
+class _DatabaseProxy:
+    """
+    Stand-in for the database object modules import as `db`
+
+    `db.users` / `db["users"]` return lazy collection handles, so holding one at
+    import time neither connects nor pins a client across a fork. Database
+    methods such as `list_collection_names` go straight to `get_db()`.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith("_") or hasattr(Database, name):
+            return getattr(get_db(), name)
+        return _CollectionProxy(name)
+
+    def __getitem__(self, name):
+        return _CollectionProxy(name)
+
+
+def get_collection(name: str) -> _CollectionProxy:
+    """Lazy, fork-safe handle to a collection in the application database"""
+    return _CollectionProxy(name)
+
+
+db = _DatabaseProxy()
+
+# Every index the app relies on: (collection, keys, options)
+INDEXES = [
+    # Login, signup, dashboard and session checks all look users up by email
+    ("users", [("email", 1)], {"unique": True}),
+
+    ("UserStocks", [("user_id", 1), ("symbol", 1)], {"unique": True}),
+    ("UserStocks", [("user_id", 1)], {}),
+    ("UserStocks", [("created_at", -1)], {}),
+
+    # Latest model per symbol, and versions for the model registry
+    ("trained_models", [("stock_symbol", 1), ("trained_on", -1)], {}),
+    ("trained_models", [("stock_symbol", 1), ("version", -1)], {}),
+    ("model_pointers", [("promoted_at", 1)], {}),
+
+    # Background training job lookups; at most one queued/running job per symbol; finished jobs expire
+    ("training_jobs", [("job_id", 1)], {"unique": True}),
+    ("training_jobs", [("symbol", 1), ("status", 1)], {}),
+    ("training_jobs", [("symbol", 1)],
+     {"unique": True, "partialFilterExpression": {"active": True}, "name": "symbol_1_active"}),
+    ("training_jobs", [("finished_at", 1)],
+     {"expireAfterSeconds": int(float(os.getenv("TRAINING_JOB_TTL_DAYS", "7")) * 86400)}),
+
+    # Materialized forecasts are read by exact (symbol, as-of date, horizon) key; old ones expire
+    ("predictions", [("symbol", 1), ("as_of", -1), ("horizon", 1)], {"unique": True}),
+    ("predictions", [("created_at", 1)],
+     {"expireAfterSeconds": int(float(os.getenv("PREDICTION_TTL_DAYS", "14")) * 86400)}),
+]
+
+
+def ensure_index(collection: str, keys, options) -> str:
+    """
+    Create one index, or bring an existing TTL index to the configured expiry
+
+    Returns:
+        The index name
+    """
+    from pymongo.errors import OperationFailure
+
+    try:
+        return db[collection].create_index(keys, **options)
+    except OperationFailure as e:
+        # IndexOptionsConflict: same keys, different TTL -> update it in place
+        if e.code != 85 or "expireAfterSeconds" not in options:
+            raise
+        get_db().command("collMod", collection, index={
+            "keyPattern": dict(keys), "expireAfterSeconds": options["expireAfterSeconds"]
+        })
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def init_db():
+    """
+    Create collections and indexes once per process
+
+    Called from `create_app()` (and by scripts that need the indexes) instead of
+    at import time, so importing this module never talks to the server. Only
+    runs with DB_INIT_ON_STARTUP=true (the default for `python
+    backend_process/app.py`); deployments create indexes once with
+    `python -m backend_process.bootstrap_db` so worker boot skips them.
+    """
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        _initialized = True
+        if os.getenv("DB_INIT_ON_STARTUP", "false").lower() != "true":
+            return
+
+        try:
+            # Ensure UserStocks collection exists with proper indexing
+            if "UserStocks" not in db.list_collection_names():
+                db.create_collection("UserStocks")
+                print("✅ UserStocks collection created")
+
+            for collection, keys, options in INDEXES:
+                try:
+                    ensure_index(collection, keys, options)
+                except Exception as e:
+                    print(f"⚠️  Warning: Could not create index {keys} on {collection}: {e}")
+
+            print("✅ Database and UserStocks collection initialized successfully")
+        except Exception as e:
+            print(f"⚠️  Warning: Could not initialize UserStocks collection: {e}")
+            print("   Collection will be created automatically when first document is inserted")
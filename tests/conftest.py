@@ -0,0 +1,26 @@
+# conftest.py - Shared fixtures for the test suite
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+FIXTURE_DIR = os.path.join(project_root, "data", "fixtures")
+
+
+@pytest.fixture
+def fixture_provider():
+    """Offline provider serving the bundled CSV bars (no synthetic fallback)"""
+    from backend_process.utils.market_data import LocalMarketData
+    return LocalMarketData(data_dir=FIXTURE_DIR, synthetic=False)
+
+
+@pytest.fixture
+def fixture_bars():
+    """Full AAPL fixture history as a Date-indexed OHLCV frame"""
+    return pd.read_csv(os.path.join(FIXTURE_DIR, "AAPL.csv"), index_col="Date", parse_dates=True).astype("float64")
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from backend_process.utils.feature_engine import FeatureCache, FeatureState, compute_features
+
+FEATURES = ["Close", "Volume", "SMA_20", "EMA_20", "RSI_14"]
+
+
+@pytest.mark.parametrize("feature", ["SMA_20", "EMA_20", "RSI_14"])
+def test_incremental_update_matches_full_recompute(fixture_bars, feature):
+    features = ["Close", feature]
+    split = 150
+    state = FeatureState.from_frame(fixture_bars.iloc[:split], features)
+
+    rows = [state.update(bar) for _, bar in fixture_bars.iloc[split:].iterrows()]
+
+    expected = compute_features(fixture_bars, features).loc[fixture_bars.index[split:]].to_numpy()
+    np.testing.assert_allclose(np.array(rows), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_feature_cache_appends_one_bar_without_reloading(fixture_bars):
+    cache = FeatureCache(max_rows=64)
+    loads = []
+
+    def load_full(frame):
+        def load():
+            loads.append(len(frame))
+            return frame
+        return load
+
+    before = fixture_bars.iloc[:-1]
+    cache.rows("AAPL", before.tail(30), FEATURES, load_full(before))
+    rows = cache.rows("AAPL", fixture_bars.tail(30), FEATURES, load_full(fixture_bars))
+
+    assert loads == [len(before)]
+    expected = compute_features(fixture_bars, FEATURES).to_numpy()[-64:]
+    np.testing.assert_allclose(rows, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_roller_does_not_advance_cached_state(fixture_bars):
+    cache = FeatureCache()
+    cache.rows("AAPL", fixture_bars.tail(30), FEATURES, lambda: fixture_bars)
+    scalers = {f: [0.0, 1.0] for f in FEATURES}
+    scalers["Volume"] = [0.0, 1e8]
+    roll = cache.roller("AAPL", FEATURES, scalers, {"Volume": 1e6})
+
+    first = roll([0.5, 0.6])
+    again = cache.roller("AAPL", FEATURES, scalers, {"Volume": 1e6})([0.5, 0.6])
+
+    np.testing.assert_array_equal(first, again)
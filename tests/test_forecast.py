@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+# predict_stock imports the database helpers at module level
+pytest.importorskip("pymongo")
+pytest.importorskip("dotenv")
+from backend_process.predict_stock import forecast_windows  # noqa: E402
+
+
+def test_multi_horizon_model_answers_in_one_pass():
+    calls = []
+
+    def step_fn(X):
+        calls.append(X.shape)
+        return np.tile(np.arange(1, 8, dtype=np.float32), (X.shape[0], 1))
+
+    forecast = forecast_windows(step_fn, np.zeros((2, 10)), days_to_predict=5, horizon=7)
+
+    assert calls == [(2, 10, 1)]
+    np.testing.assert_array_equal(forecast, np.tile(np.arange(1, 6), (2, 1)))
+
+
+def test_single_output_model_rolls_forecasts_into_the_window():
+    # Predicts the last value of the window plus one
+    step_fn = lambda X: X[:, -1, :1] + 1
+
+    forecast = forecast_windows(step_fn, np.array([[0.0, 1.0, 2.0]]), days_to_predict=4, horizon=1)
+
+    np.testing.assert_array_equal(forecast, [[3.0, 4.0, 5.0, 6.0]])
+
+
+def test_multi_feature_windows_need_a_roller_past_the_horizon():
+    step_fn = lambda X: np.zeros((X.shape[0], 2))
+
+    with pytest.raises(ValueError):
+        forecast_windows(step_fn, np.zeros((1, 5, 3)), days_to_predict=3, horizon=2)
+
+    roll = lambda closes: np.repeat(np.asarray(closes)[:, None], 3, axis=1)
+    forecast = forecast_windows(step_fn, np.zeros((1, 5, 3)), days_to_predict=3, horizon=2, roll_fns=[roll])
+    assert forecast.shape == (1, 3)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from backend_process.utils.model_artifacts import export_artifact, load_artifact
+from backend_process.utils.numpy_lstm import NumpyLSTMModel
+
+
+def _random_model(seed=0, features=3, units=8, horizon=2):
+    rng = np.random.default_rng(seed)
+    return NumpyLSTMModel([
+        {"kind": "LSTM", "activation": "tanh", "recurrent_activation": "sigmoid", "return_sequences": True,
+         "kernel": rng.normal(0, 0.3, (1, features, 4 * units)).astype(np.float32),
+         "recurrent_kernel": rng.normal(0, 0.3, (1, units, 4 * units)).astype(np.float32),
+         "bias": rng.normal(0, 0.1, (1, 4 * units)).astype(np.float32)},
+        {"kind": "LSTM", "activation": "tanh", "recurrent_activation": "sigmoid", "return_sequences": False,
+         "kernel": rng.normal(0, 0.3, (1, units, 4 * units)).astype(np.float32),
+         "recurrent_kernel": rng.normal(0, 0.3, (1, units, 4 * units)).astype(np.float32),
+         "bias": rng.normal(0, 0.1, (1, 4 * units)).astype(np.float32)},
+        {"kind": "Dense", "activation": "linear",
+         "kernel": rng.normal(0, 0.3, (1, units, horizon)).astype(np.float32),
+         "bias": rng.normal(0, 0.1, (1, horizon)).astype(np.float32)},
+    ])
+
+
+def test_forward_pass_matches_keras(tmp_path):
+    pytest.importorskip("h5py")
+    tf = pytest.importorskip("tensorflow")
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+
+    keras_model = tf.keras.Sequential([
+        LSTM(8, return_sequences=True, input_shape=(20, 3)),
+        Dropout(0.2),
+        LSTM(8, return_sequences=False),
+        Dense(2),
+    ])
+    path = str(tmp_path / "model.h5")
+    keras_model.save(path)
+    X = np.random.default_rng(1).random((16, 20, 3), dtype=np.float32)
+
+    expected = np.asarray(keras_model(X, training=False))
+    actual = NumpyLSTMModel.from_h5(path).predict(X)
+
+    np.testing.assert_allclose(actual, expected, atol=1e-4)
+
+
+def test_stacked_models_match_individual_models():
+    models = [_random_model(seed) for seed in range(3)]
+    X = np.random.default_rng(2).random((3, 20, 3), dtype=np.float32)
+
+    stacked = NumpyLSTMModel.stack(models).predict(X)
+
+    for i, model in enumerate(models):
+        np.testing.assert_allclose(stacked[i], model.predict(X[i:i + 1])[0], rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("dtype, atol", [("float32", 1e-6), ("float16", 5e-3), ("int8", 5e-2)])
+def test_artifact_round_trip(tmp_path, dtype, atol):
+    model = _random_model()
+    X = np.random.default_rng(3).random((8, 20, 3), dtype=np.float32)
+
+    mapped = load_artifact(export_artifact(model, str(tmp_path / "model.lstmq"), dtype))
+
+    assert mapped.signature() == model.signature()
+    np.testing.assert_allclose(mapped.predict(X), model.predict(X), atol=atol)
@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend_process.utils.market_data import LocalMarketData
+from backend_process.utils.price_store import PriceStore
+
+
+class RecordingProvider(LocalMarketData):
+    """Fixture provider that records each history call and can be switched off"""
+
+    def __init__(self, data_dir, fail=False):
+        super().__init__(data_dir=data_dir, synthetic=False)
+        self.calls = []
+        self.fail = fail
+
+    def history(self, symbols, start, end):
+        self.calls.append((tuple(symbols), pd.Timestamp(start).date()))
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return super().history(symbols, start, end)
+
+
+def test_refresh_downloads_full_history_once(tmp_path, fixture_provider, fixture_bars):
+    provider = RecordingProvider(fixture_provider.data_dir)
+    store = PriceStore(str(tmp_path), provider)
+
+    history = store.get_history("aapl")
+
+    pd.testing.assert_frame_equal(history, fixture_bars, check_names=False, check_freq=False, check_index_type=False)
+    store.get_history("AAPL")
+    assert len(provider.calls) == 1
+
+
+def test_refresh_appends_only_missing_bars(tmp_path, fixture_provider, fixture_bars):
+    provider = RecordingProvider(fixture_provider.data_dir)
+    store = PriceStore(str(tmp_path), provider)
+    # Pretend an earlier run stored the first 200 bars, the last one partial
+    stored = fixture_bars.iloc[:200].copy()
+    stored.iloc[-1, stored.columns.get_loc("Close")] = -1.0
+    store._write("AAPL", store._to_bars(stored))
+
+    history = store.get_history("AAPL")
+
+    assert provider.calls == [(("AAPL",), fixture_bars.index[199].date())]
+    pd.testing.assert_frame_equal(history, fixture_bars, check_names=False, check_freq=False, check_index_type=False)
+
+
+def test_refresh_groups_symbols_by_start_date(tmp_path, fixture_provider, fixture_bars):
+    provider = RecordingProvider(fixture_provider.data_dir)
+    store = PriceStore(str(tmp_path), provider)
+    store._write("AAPL", store._to_bars(fixture_bars.iloc[:-5]))
+
+    store.refresh(["AAPL", "MSFT"])
+
+    assert sorted(provider.calls) == sorted([
+        (("AAPL",), fixture_bars.index[-6].date()),
+        (("MSFT",), pd.Timestamp("2020-01-01").date()),
+    ])
+
+
+def test_refresh_rechecks_after_ttl(tmp_path, fixture_provider):
+    provider = RecordingProvider(fixture_provider.data_dir)
+    store = PriceStore(str(tmp_path), provider, ttl_seconds=0.05)
+
+    store.refresh(["AAPL"])
+    store.refresh(["AAPL"])
+    time.sleep(0.06)
+    store.refresh(["AAPL"])
+
+    assert len(provider.calls) == 2
+
+
+def test_failed_refresh_backs_off_and_serves_stored_bars(tmp_path, fixture_provider, fixture_bars):
+    provider = RecordingProvider(fixture_provider.data_dir, fail=True)
+    store = PriceStore(str(tmp_path), provider, retry_seconds=60)
+    store._write("AAPL", store._to_bars(fixture_bars))
+
+    first = store.get_history("AAPL")
+    store.get_history("AAPL")
+
+    assert len(provider.calls) == 1
+    np.testing.assert_allclose(first["Close"].to_numpy(), fixture_bars["Close"].to_numpy())